@@ -14,6 +14,7 @@ from database import get_db
 from models import Book, User
 from schemas import BookCreate
 from auth import get_current_admin_user
+import search_index
 import os
 
 # Create admin app
@@ -91,6 +92,8 @@ async def add_book(
         )
         
         db.add(book)
+        db.flush()
+        search_index.index_book(db, book)
         db.commit()
         db.refresh(book)
         
@@ -120,6 +123,9 @@ async def seed_database(request: Request, db: Session = Depends(get_db)):
         for book in sample_books:
             db.add(book)
         
+        db.flush()
+        for book in sample_books:
+            search_index.index_book(db, book)
         db.commit()
         
         return HTMLResponse(f"<h1>Database seeded successfully!</h1><p>Added {len(sample_books)} books.</p><p><a href='/'>Go to Dashboard</a></p>")
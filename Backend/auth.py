@@ -1,11 +1,19 @@
 from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.orm import Session
+from collections import OrderedDict
+from database import get_db
+from models import User
+import password_pool
 import jwt
 import bcrypt
+import hashlib
 import os
 import secrets
 import re
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,12 +27,29 @@ if not SECRET_KEY:
 
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_HOURS = int(os.getenv("ACCESS_TOKEN_EXPIRE_HOURS", "24"))
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "300"))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+INVALID_TOKEN_CACHE_SECONDS = int(os.getenv("INVALID_TOKEN_CACHE_SECONDS", "30"))
+BCRYPT_REHASH_ON_LOGIN = os.getenv("BCRYPT_REHASH_ON_LOGIN", "true").lower() in ("1", "true", "yes")
 
 # Password validation regex
 PASSWORD_PATTERN = re.compile(r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$')
 
 security = HTTPBearer()
 
+# sha256(token) -> (payload, error detail, expires_at); exactly one of payload/error is set
+_token_cache = OrderedDict()
+_token_lock = threading.Lock()
+token_cache_hits = 0
+token_cache_misses = 0
+
+# username -> (principal, expires_at) for tokens that can't vouch for themselves
+_principal_cache = OrderedDict()
+# username -> time of the last privilege change; tokens issued before it are re-resolved
+_privileges_changed_at = {}
+_principal_lock = threading.Lock()
+
 def create_access_token(data: dict):
     """Create a secure JWT access token"""
     to_encode = data.copy()
@@ -37,34 +62,20 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(token: str):
-    """Verify and decode JWT token with enhanced security"""
-    if not token or not isinstance(token, str):
-        raise HTTPException(status_code=401, detail="Invalid token format")
-    
-    # Basic token format validation
-    if not token.count('.') == 2:
-        raise HTTPException(status_code=401, detail="Invalid token format")
-    
+def _decode_token(token: str) -> dict:
+    """Decode and check a JWT, raising a 401 HTTPException on any problem"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        
-        # Additional security checks
-        if payload.get("type") != "access":
-            raise HTTPException(status_code=401, detail="Invalid token type")
-            
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
     except jwt.InvalidTokenError as e:
         raise HTTPException(status_code=401, detail="Invalid token")
     except Exception as e:
         raise HTTPException(status_code=401, detail="Token verification failed")
-
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current authenticated user"""
-    token = credentials.credentials
-    payload = verify_token(token)
+    
+    # Additional security checks
+    if payload.get("type") != "access":
+        raise HTTPException(status_code=401, detail="Invalid token type")
     
     # Ensure required fields exist
     if not payload.get("sub"):
@@ -72,20 +83,123 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     
     return payload
 
-def get_current_admin_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current authenticated admin user"""
-    token = credentials.credentials
-    payload = verify_token(token)
+def _cache_token(key: bytes, payload, error, expires_at: float):
+    with _token_lock:
+        _token_cache[key] = (payload, error, expires_at)
+        _token_cache.move_to_end(key)
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+
+def verify_token(token: str):
+    """Verify and decode JWT token with enhanced security.
+
+    Verified payloads are cached by token digest until the token expires, and
+    rejections for INVALID_TOKEN_CACHE_SECONDS, so repeat requests skip the
+    signature check. The returned payload is shared; don't mutate it.
+    """
+    global token_cache_hits, token_cache_misses
+    if not token or not isinstance(token, str):
+        raise HTTPException(status_code=401, detail="Invalid token format")
     
-    # Ensure required fields exist
-    if not payload.get("sub"):
-        raise HTTPException(status_code=401, detail="Invalid token payload")
+    # Basic token format validation
+    if not token.count('.') == 2:
+        raise HTTPException(status_code=401, detail="Invalid token format")
+    
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    now = time.time()
+    with _token_lock:
+        cached = _token_cache.get(key)
+        if cached is not None and cached[2] <= now:
+            del _token_cache[key]
+            cached = None
+        if cached is not None:
+            _token_cache.move_to_end(key)
+            token_cache_hits += 1
+        else:
+            token_cache_misses += 1
+    
+    if cached is not None:
+        payload, error, _ = cached
+        if error:
+            raise HTTPException(status_code=401, detail=error)
+        return payload
+    
+    try:
+        payload = _decode_token(token)
+    except HTTPException as e:
+        _cache_token(key, None, e.detail, now + INVALID_TOKEN_CACHE_SECONDS)
+        raise
+    
+    _cache_token(key, payload, None, payload["exp"])
+    return payload
+
+def invalidate_principal(username: str):
+    """Force tokens issued before now to re-resolve the user's id and privileges"""
+    with _principal_lock:
+        _principal_cache.pop(username, None)
+        _privileges_changed_at[username] = time.time()
+
+def resolve_principal(payload: dict, db: Session) -> dict:
+    """Resolve a token payload to {"uid", "is_admin"}, hitting the database only when needed"""
+    username = payload["sub"]
+    
+    # Tokens carrying the user id are trusted unless privileges changed after they were issued
+    changed_at = _privileges_changed_at.get(username)
+    if "uid" in payload and (changed_at is None or payload.get("iat", 0) > changed_at):
+        return {"uid": payload["uid"], "is_admin": bool(payload.get("is_admin", False))}
+    
+    now = time.time()
+    with _principal_lock:
+        cached = _principal_cache.get(username)
+        if cached and cached[1] > now:
+            _principal_cache.move_to_end(username)
+            return cached[0]
+    
+    user = db.query(User.id, User.is_admin).filter(User.username == username).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    principal = {"uid": user.id, "is_admin": bool(user.is_admin)}
+    with _principal_lock:
+        _principal_cache[username] = (principal, now + PRINCIPAL_CACHE_TTL_SECONDS)
+        _principal_cache.move_to_end(username)
+        while len(_principal_cache) > PRINCIPAL_CACHE_SIZE:
+            _principal_cache.popitem(last=False)
+    return principal
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+):
+    """Get current authenticated user"""
+    payload = verify_token(credentials.credentials)
+    return {**payload, **resolve_principal(payload, db)}
+
+def get_current_admin_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+):
+    """Get current authenticated admin user"""
+    payload = verify_token(credentials.credentials)
+    principal = {**payload, **resolve_principal(payload, db)}
     
     # Check admin privileges
-    if not payload.get("is_admin", False):
+    if not principal["is_admin"]:
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    return payload
+    return principal
+
+def token_cache_stats() -> dict:
+    """Verified-token cache counters"""
+    with _token_lock:
+        lookups = token_cache_hits + token_cache_misses
+        return {
+            "entries": len(_token_cache),
+            "max_entries": TOKEN_CACHE_SIZE,
+            "hits": token_cache_hits,
+            "misses": token_cache_misses,
+            "hit_ratio": round(token_cache_hits / lookups, 4) if lookups else 0.0,
+        }
 
 def validate_password_strength(password: str) -> tuple[bool, str]:
     """Validate password strength and return (is_valid, error_message)"""
@@ -97,8 +211,8 @@ def validate_password_strength(password: str) -> tuple[bool, str]:
     
     return True, ""
 
-def hash_password(password: str) -> str:
-    """Hash password with bcrypt"""
+def check_new_password(password: str):
+    """Raise ValueError if a new password is empty or too weak"""
     if not password:
         raise ValueError("Password cannot be empty")
     
@@ -106,8 +220,27 @@ def hash_password(password: str) -> str:
     is_valid, error_msg = validate_password_strength(password)
     if not is_valid:
         raise ValueError(error_msg)
-    
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+def hash_password(password: str) -> str:
+    """Hash password with bcrypt"""
+    check_new_password(password)
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=password_pool.BCRYPT_ROUNDS)).decode('utf-8')
+
+async def hash_password_async(password: str) -> str:
+    """Hash password with bcrypt in the dedicated hashing pool"""
+    check_new_password(password)
+    return await password_pool.hash_password(password)
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """Verify password against hash in the dedicated hashing pool"""
+    if not password or not hashed_password:
+        return False
+    return await password_pool.check_password(password, hashed_password)
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash was made with a different cost factor than BCRYPT_ROUNDS"""
+    rounds = password_pool.hash_rounds(hashed_password)
+    return BCRYPT_REHASH_ON_LOGIN and rounds is not None and rounds != password_pool.BCRYPT_ROUNDS
 
 def verify_password(password: str, hashed_password: str) -> bool:
     """Verify password against hash"""
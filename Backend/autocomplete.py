@@ -0,0 +1,139 @@
+from collections import deque
+from search_index import tokenize
+import threading
+
+class _TrieNode:
+    __slots__ = ("children", "book_ids")
+
+    def __init__(self):
+        self.children = {}
+        self.book_ids = {}  # used as an insertion-ordered set
+
+class PrefixIndex:
+    """In-process prefix trie over normalized title and author tokens.
+
+    Each book is stored once with its search entry (raw column values), so lookups
+    never touch the database. Writes made through this process are applied
+    directly; main.sync_autocomplete picks up everyone else's periodically.
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+        self._tokens = {}
+        self._results = {}
+        self._lock = threading.Lock()
+        self.ready = False
+
+    def __len__(self):
+        return len(self._results)
+
+    def rebuild(self, entries):
+        """Replace the index contents with (book_id, title, author, result) entries"""
+        root = _TrieNode()
+        tokens_by_book = {}
+        results = {}
+        for book_id, title, author, result in entries:
+            tokens = self._book_tokens(title, author)
+            for token in tokens:
+                self._insert(root, token, book_id)
+            tokens_by_book[book_id] = tokens
+            results[book_id] = result
+
+        with self._lock:
+            self._root = root
+            self._tokens = tokens_by_book
+            self._results = results
+            self.ready = True
+
+    def add(self, book_id: int, title: str, author: str, result: dict):
+        """Add a book, replacing any previous entry for the same id"""
+        tokens = self._book_tokens(title, author)
+        with self._lock:
+            self._remove_locked(book_id)
+            for token in tokens:
+                self._insert(self._root, token, book_id)
+            self._tokens[book_id] = tokens
+            self._results[book_id] = result
+
+    def remove(self, book_id: int):
+        """Drop a book from the index (no-op if it is not indexed)"""
+        with self._lock:
+            self._remove_locked(book_id)
+
+    def search(self, query: str, limit: int = 10) -> list:
+        """Return up to `limit` results whose tokens start with every query token"""
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        # Walk the subtree of the longest (most selective) token, shortest completions first
+        anchor = max(query_tokens, key=len)
+        others = [token for token in query_tokens if token != anchor]
+
+        with self._lock:
+            node = self._root
+            for char in anchor:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+
+            results = []
+            seen = set()
+            pending = deque([node])
+            while pending and len(results) < limit:
+                current = pending.popleft()
+                for book_id in current.book_ids:
+                    if book_id in seen:
+                        continue
+                    seen.add(book_id)
+                    if self._matches_all(book_id, others):
+                        results.append(self._results[book_id])
+                        if len(results) >= limit:
+                            break
+                pending.extend(current.children.values())
+            return results
+
+    def _matches_all(self, book_id: int, query_tokens: list) -> bool:
+        book_tokens = self._tokens[book_id]
+        return all(
+            any(token.startswith(query_token) for token in book_tokens)
+            for query_token in query_tokens
+        )
+
+    @staticmethod
+    def _book_tokens(title: str, author: str) -> tuple:
+        return tuple(dict.fromkeys(tokenize(title) + tokenize(author)))
+
+    @staticmethod
+    def _insert(root: _TrieNode, token: str, book_id: int):
+        node = root
+        for char in token:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            node = child
+        node.book_ids[book_id] = None
+
+    def _remove_locked(self, book_id: int):
+        tokens = self._tokens.pop(book_id, None)
+        self._results.pop(book_id, None)
+        if not tokens:
+            return
+
+        for token in tokens:
+            path = [self._root]
+            for char in token:
+                node = path[-1].children.get(char)
+                if node is None:
+                    break
+                path.append(node)
+            else:
+                path[-1].book_ids.pop(book_id, None)
+                # Prune branches that no longer lead to any book
+                for depth in range(len(token), 0, -1):
+                    node = path[depth]
+                    if node.book_ids or node.children:
+                        break
+                    del path[depth - 1].children[token[depth - 1]]
+
+autocomplete_index = PrefixIndex()
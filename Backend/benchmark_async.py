@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the catalog read endpoints: sync engine vs ASYNC_DB
+Starts the API once per mode (response cache disabled so every request hits
+the database) and drives it with concurrent clients. Requires httpx.
+"""
+
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+HOST = "127.0.0.1"
+PORT = int(os.getenv("BENCH_PORT", "8765"))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", "100"))
+DURATION_SECONDS = float(os.getenv("BENCH_DURATION", "10"))
+PATHS = [
+    "/books?per_page=12",
+    "/books?per_page=12&sort_by=price&sort_order=asc",
+    "/books?per_page=12&page=3",
+    "/categories",
+]
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("API did not start")
+
+async def drive(client: httpx.AsyncClient, deadline: float, latencies: list, worker: int):
+    i = worker
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        response = await client.get(PATHS[i % len(PATHS)])
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        i += 1
+
+async def run_mode(async_db: bool) -> dict:
+    env = dict(os.environ, ASYNC_DB="true" if async_db else "false", RESPONSE_CACHE_SIZE="0")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", HOST, "--port", str(PORT), "--log-level", "warning"],
+        env=env,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    try:
+        limits = httpx.Limits(max_connections=CONCURRENCY)
+        async with httpx.AsyncClient(base_url=f"http://{HOST}:{PORT}", limits=limits, timeout=30) as client:
+            await wait_until_ready(client)
+            latencies = []
+            deadline = time.monotonic() + DURATION_SECONDS
+            await asyncio.gather(*(drive(client, deadline, latencies, n) for n in range(CONCURRENCY)))
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / DURATION_SECONDS,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+def main():
+    print(f"📊 {CONCURRENCY} concurrent clients, {DURATION_SECONDS:.0f}s per mode")
+    for async_db in (False, True):
+        result = asyncio.run(run_mode(async_db))
+        label = "async" if async_db else "sync "
+        print(
+            f"{label}: {result['rps']:8.1f} req/s  "
+            f"p50 {result['p50_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms  "
+            f"({result['requests']} requests)"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Per-row cost of reading a book list page: ORM instances (db.query(Book))
+against the column-tuple path (select_books). Reports Python allocations
+(peak traced bytes) and CPU time per row. Builds its own throwaway SQLite database.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = tempfile.mkdtemp(prefix="bench-reads-")
+os.environ["DATABASE_URL"] = f"sqlite:///{BENCH_DIR}/bench.db"
+os.chdir(BENCH_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from database import SessionLocal
+from models import Book
+import main
+
+BOOKS = int(os.getenv("BENCH_BOOKS", "2000"))
+PAGE_SIZE = int(os.getenv("BENCH_PAGE_SIZE", "50"))
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "200"))
+
+def seed(db):
+    now = datetime.utcnow()
+    db.execute(insert(Book), [
+        {
+            "title": f"गोदान भाग {n}",
+            "author": "मुंशी प्रेमचंद",
+            "description": "भारतीय किसान जीवन का महान उपन्यास। " * 4,
+            "category": "साहित्य",
+            "price": 100.0 + n,
+            "image_url": f"book-{n}.jpg",
+            "stock_quantity": n % 40,
+            "is_available": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for n in range(BOOKS)
+    ])
+    db.commit()
+
+# Only the fetch is timed: book_payload costs the same for either kind of row
+
+def orm_page(db, offset: int) -> list:
+    return db.query(Book).filter(Book.is_available == True).order_by(Book.id).offset(offset).limit(PAGE_SIZE).all()
+
+def tuple_page(db, offset: int) -> list:
+    return db.execute(
+        main.select_books(Book.is_available == True).order_by(Book.id).offset(offset).limit(PAGE_SIZE)
+    ).all()
+
+def peak_bytes_per_row(fn) -> float:
+    """Peak Python memory allocated while fetching one page, per row (fresh session, as per request)"""
+    db = SessionLocal()
+    try:
+        fn(db, 0)
+        tracemalloc.start()
+        page = fn(db, PAGE_SIZE)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak / len(page)
+    finally:
+        db.close()
+
+def cpu_per_row(fn) -> float:
+    """CPU microseconds per row, one session per page as in a request"""
+    pages = max(1, BOOKS // PAGE_SIZE)
+    start = time.process_time()
+    for n in range(ITERATIONS):
+        db = SessionLocal()
+        try:
+            fn(db, (n % pages) * PAGE_SIZE)
+        finally:
+            db.close()
+    return (time.process_time() - start) / (ITERATIONS * PAGE_SIZE) * 1_000_000
+
+def main_():
+    db = SessionLocal()
+    try:
+        seed(db)
+    finally:
+        db.close()
+
+    print(f"📊 {BOOKS} books, {PAGE_SIZE}-row pages, {ITERATIONS} pages per path")
+    results = {}
+    for label, fn in (("orm   ", orm_page), ("tuples", tuple_page)):
+        results[label] = (peak_bytes_per_row(fn), cpu_per_row(fn))
+        peak, cpu = results[label]
+        print(f"{label}: {peak:8.0f} peak bytes/row  {cpu:7.2f} µs CPU/row")
+    orm, tuples = results["orm   "], results["tuples"]
+    print(f"ratio : {orm[0] / tuples[0]:8.1f}x less memory      {orm[1] / tuples[1]:7.1f}x less CPU")
+
+if __name__ == "__main__":
+    main_()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+CPU cost of serializing a 50-book /books page: the old path (dict per book,
+PaginatedBooks validation, jsonable_encoder, stdlib json) against the
+current one (dict per book straight to bytes via serialization.dumps).
+Runs offline on transient Book objects; no server or database needed.
+"""
+
+from datetime import datetime
+import json
+import os
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from models import Book
+from schemas import PaginatedBooks
+import serialization
+
+PAGE_SIZE = int(os.getenv("BENCH_PAGE_SIZE", "50"))
+ITERATIONS = int(os.getenv("BENCH_ITERATIONS", "2000"))
+
+def make_books(count: int) -> list:
+    now = datetime.utcnow()
+    return [
+        Book(
+            id=n,
+            title=f"गोदान भाग {n}",
+            author="मुंशी प्रेमचंद",
+            description="भारतीय किसान जीवन का महान उपन्यास, जो ग्रामीण समाज की गरीबी और संघर्ष को दर्शाता है। " * 3,
+            category="साहित्य",
+            price=399.0 + n,
+            image_url=f"book-{n}.jpg",
+            stock_quantity=n % 40,
+            is_available=True,
+            created_at=now
+        )
+        for n in range(1, count + 1)
+    ]
+
+def book_dict(book: Book) -> dict:
+    return {
+        "id": book.id,
+        "title": book.title,
+        "author": book.author,
+        "description": book.description,
+        "category": book.category,
+        "price": book.price,
+        "image_url": f"/static/images/books/{book.image_url}",
+        "image_srcset": None,
+        "stock_quantity": book.stock_quantity,
+        "is_available": book.is_available,
+        "created_at": book.created_at
+    }
+
+def page_fields(books: list) -> dict:
+    return {"total": 5000, "page": 1, "per_page": len(books), "pages": 100, "next_cursor": None, "prev_cursor": None}
+
+def before(books: list) -> bytes:
+    page = PaginatedBooks(books=[book_dict(book) for book in books], **page_fields(books))
+    return json.dumps(
+        jsonable_encoder(page), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+def after(books: list) -> bytes:
+    return serialization.dumps({"books": [book_dict(book) for book in books], **page_fields(books)})
+
+def measure(fn, books: list) -> float:
+    """CPU microseconds per call"""
+    fn(books)
+    start = time.process_time()
+    for _ in range(ITERATIONS):
+        fn(books)
+    return (time.process_time() - start) / ITERATIONS * 1_000_000
+
+def main():
+    books = make_books(PAGE_SIZE)
+    assert json.loads(before(books)) == json.loads(after(books)), "paths disagree"
+    encoder = "orjson" if serialization.orjson is not None else "stdlib json"
+    print(f"📊 {PAGE_SIZE}-book page, {ITERATIONS} iterations, fast path uses {encoder}")
+    old = measure(before, books)
+    new = measure(after, books)
+    print(f"before: {old:8.1f} µs CPU/request")
+    print(f"after : {new:8.1f} µs CPU/request  ({old / new:.1f}x, {old - new:.1f} µs saved)")
+
+if __name__ == "__main__":
+    main()
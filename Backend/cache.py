@@ -0,0 +1,208 @@
+from collections import OrderedDict
+from typing import Optional
+import os
+import threading
+import time
+
+from compression import compress
+
+COUNT_CACHE_SIZE = int(os.getenv("COUNT_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "300"))
+# Writes from other processes (admin panel, other workers) only show up once an entry expires
+COUNT_CACHE_TTL_SECONDS = float(os.getenv("COUNT_CACHE_TTL_SECONDS", str(RESPONSE_CACHE_TTL_SECONDS)))
+
+# ==================== CATALOG VERSION ====================
+
+# Bumped by every book write in this process; cached data tagged with an
+# older version is stale.
+_catalog_version = 0
+_version_lock = threading.Lock()
+
+def get_catalog_version() -> int:
+    """Current catalog version"""
+    return _catalog_version
+
+def bump_catalog_version() -> int:
+    """Mark the catalog as changed and return the new version"""
+    global _catalog_version
+    with _version_lock:
+        _catalog_version += 1
+        return _catalog_version
+
+# ==================== COUNT CACHE ====================
+
+class CountCache:
+    """Bounded LRU of listing totals keyed by the normalized filter tuple, with a TTL"""
+
+    def __init__(self, max_entries: int = COUNT_CACHE_SIZE, ttl: float = COUNT_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, version, total)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, allow_stale: bool = False) -> Optional[int]:
+        """Cached total for key, or None if missing, expired or stale (unless allow_stale)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, version, total = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            if version != _catalog_version and not allow_stale:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return total
+
+    def set(self, key, total: int, version: int):
+        """Store a total computed at the given catalog version"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, version, total)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+count_cache = CountCache()
+
+# ==================== RESPONSE CACHE ====================
+
+def response_cache_key(route: str, **params) -> tuple:
+    """Cache key from the route and its query params in a fixed order, unset params dropped"""
+    return (route, tuple((name, value) for name, value in sorted(params.items()) if value is not None))
+
+class CachedBody:
+    """A rendered response body, its validator and its compressed encodings"""
+    __slots__ = ("body", "etag", "encoded")
+
+    def __init__(self, body: bytes, etag: Optional[str] = None):
+        self.body = body
+        self.etag = etag
+        self.encoded = {}  # content coding -> compressed body
+
+    def encode(self, encoding: str) -> bytes:
+        """Body compressed with the given coding, computed once per entry"""
+        data = self.encoded.get(encoding)
+        if data is None:
+            # Concurrent first requests may both compress; either result is fine to keep
+            data = compress(self.body, encoding)
+            self.encoded[encoding] = data
+        return data
+
+class ResponseCache:
+    """Bounded LRU + TTL cache of rendered response bodies.
+
+    Entries carry tags (e.g. "books", "book:42") so writes can drop exactly
+    the responses they affect.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, tags, CachedBody)
+        self._tagged = {}  # tag -> set of keys
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key) -> Optional[CachedBody]:
+        """Cached body for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= time.monotonic():
+                self._discard(key)
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, key, body: bytes, tags=(), version: Optional[int] = None,
+            etag: Optional[str] = None) -> CachedBody:
+        """Store a rendered body under key and return it.
+
+        When `version` is given and the catalog has changed since, the body
+        was built from data a concurrent write may have replaced, so it is
+        returned without being stored.
+        """
+        cached = CachedBody(body, etag)
+        with self._lock:
+            if version is not None and version != _catalog_version:
+                return cached
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + self.ttl, tuple(tags), cached)
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+        return cached
+
+    def invalidate(self, *tags):
+        """Drop every entry carrying any of the given tags"""
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tagged.get(tag, ())):
+                    self._discard(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._tagged.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[1]:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tagged[tag]
+
+response_cache = ResponseCache()
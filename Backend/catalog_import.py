@@ -0,0 +1,102 @@
+from typing import AsyncIterator
+import csv
+import json
+
+from starlette.responses import StreamingResponse
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+class ImportRowError(Exception):
+    """A single input record that could not be parsed"""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(message)
+        self.line = line
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple]:
+    """Yield (line_number, text) from a byte stream without holding more than one line"""
+    buffer = b""
+    line_number = 0
+    first = True
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line_number += 1
+            text = raw.decode("utf-8-sig" if first else "utf-8").rstrip("\r")
+            first = False
+            yield line_number, text
+    if buffer:
+        line_number += 1
+        yield line_number, buffer.decode("utf-8-sig" if first else "utf-8").rstrip("\r")
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator:
+    """Yield (line_number, dict) per JSON line; unparseable lines yield ImportRowError"""
+    async for line_number, text in _iter_lines(chunks):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            yield line_number, ImportRowError(line_number, f"invalid JSON: {str(e)}")
+            continue
+        yield line_number, record
+
+async def iter_csv(chunks: AsyncIterator[bytes], optional_fields=()) -> AsyncIterator:
+    """Yield (line_number, dict) per CSV record, keyed by the header row.
+
+    Quoted fields may span lines: a record is complete once it holds an even
+    number of quote characters (escaped quotes are doubled, so parity holds).
+    """
+    header = None
+    record_lines = []
+    record_start = 0
+    async for line_number, text in _iter_lines(chunks):
+        if not record_lines:
+            record_start = line_number
+        record_lines.append(text)
+        if sum(part.count('"') for part in record_lines) % 2:
+            continue
+
+        record = "\n".join(record_lines)
+        record_lines = []
+        if not record.strip():
+            continue
+
+        values = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield record_start, ImportRowError(
+                record_start, f"expected {len(header)} columns, got {len(values)}"
+            )
+            continue
+        # Empty cells in optional columns fall back to the model defaults
+        yield record_start, {
+            name: value for name, value in zip(header, values)
+            if value != "" or name not in optional_fields
+        }
+
+    if record_lines:
+        yield record_start, ImportRowError(record_start, "unterminated quoted field")
+
+def iter_records(chunks: AsyncIterator[bytes], fmt: str, optional_fields=()) -> AsyncIterator:
+    """Parse an import body incrementally in the given format"""
+    if fmt == "csv":
+        return iter_csv(chunks, optional_fields)
+    return iter_ndjson(chunks)
+
+class ImportProgressResponse(StreamingResponse):
+    """StreamingResponse that leaves receive() to the body iterator.
+
+    The stock response watches receive() for a disconnect while streaming,
+    which would swallow the request body chunks the import is still reading.
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,86 @@
+from typing import Optional
+import gzip
+import os
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from static_assets import accepted_encodings, brotli
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/javascript", "application/xml",
+    "image/svg+xml", "text/",
+)
+
+def negotiate(headers: Headers) -> Optional[str]:
+    """Best content coding the client accepts: br (if available), then gzip"""
+    accepted = accepted_encodings(headers)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, GZIP_LEVEL, mtime=0)
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+class CompressionMiddleware:
+    """Compress complete (non-streaming) text responses above COMPRESSION_MIN_BYTES.
+
+    Responses that already set Content-Encoding (cached catalog bodies,
+    precompressed assets, the export) and streamed responses (import
+    progress) pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if start_message is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if (
+                not message.get("more_body", False)
+                and "content-encoding" not in headers
+                and is_compressible(headers.get("content-type", ""))
+                and len(body) >= COMPRESSION_MIN_BYTES
+            ):
+                body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # The encoded bytes differ, so the validator can only be weak
+                    headers["ETag"] = f"W/{etag}"
+                message = dict(message, body=body)
+            await send(start_message)
+            start_message = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
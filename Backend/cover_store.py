@@ -0,0 +1,79 @@
+from typing import Optional
+import hashlib
+import os
+import tempfile
+
+from image_variants import IMAGES_DIR
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+MAX_COVER_BYTES = int(os.getenv("MAX_COVER_BYTES", str(10 * 1024 * 1024)))
+
+class CoverRejected(Exception):
+    """The uploaded file is not an acceptable cover image"""
+
+class CoverTooLarge(CoverRejected):
+    """The upload is larger than MAX_COVER_BYTES"""
+
+def sniff_extension(head: bytes) -> Optional[str]:
+    """File extension for an image from its magic bytes, or None if unsupported"""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    return None
+
+class CoverWriter:
+    """Streams an upload into the image store under its SHA-256 digest.
+
+    Chunks are hashed while being written to a temp file in the store
+    directory; finish() renames it to <digest>.<ext>, or drops it if that
+    file already exists, so identical covers are stored once. The size limit
+    is checked per chunk, before anything past it is written. Blocking:
+    call the methods from a thread.
+    """
+
+    def __init__(self):
+        os.makedirs(IMAGES_DIR, exist_ok=True)
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.extension = None
+        fd, self.tmp_path = tempfile.mkstemp(dir=IMAGES_DIR, prefix=".upload-")
+        self._tmp = os.fdopen(fd, "wb")
+
+    def write(self, chunk: bytes):
+        if not chunk:
+            return
+        if self.extension is None:
+            self.extension = sniff_extension(chunk)
+            if self.extension is None:
+                raise CoverRejected("Unsupported image type (use JPEG, PNG, WebP or GIF)")
+        self.size += len(chunk)
+        if self.size > MAX_COVER_BYTES:
+            raise CoverTooLarge(f"Image is larger than {MAX_COVER_BYTES} bytes")
+        self.digest.update(chunk)
+        self._tmp.write(chunk)
+
+    def finish(self) -> tuple:
+        """Move the upload into place; returns (filename, digest, size, created)"""
+        self._tmp.close()
+        if self.size == 0:
+            raise CoverRejected("Empty file")
+        digest = self.digest.hexdigest()
+        filename = f"{digest}.{self.extension}"
+        path = os.path.join(IMAGES_DIR, filename)
+        if os.path.exists(path):
+            os.remove(self.tmp_path)
+            return filename, digest, self.size, False
+        os.chmod(self.tmp_path, 0o644)
+        os.replace(self.tmp_path, path)
+        return filename, digest, self.size, True
+
+    def discard(self):
+        """Remove the temp file unless finish() already moved it (safe to call twice)"""
+        self._tmp.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
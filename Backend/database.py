@@ -1,9 +1,18 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import os
 import logging
+import threading
+import time
+
+try:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+except ImportError:  # greenlet missing
+    AsyncSession = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -12,6 +21,9 @@ logger = logging.getLogger(__name__)
 # Database configuration - Using environment variables or defaults
 DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./hindi_books.db")
 
+# How long /health reuses its last database probe
+HEALTH_CHECK_TTL_SECONDS = float(os.environ.get("HEALTH_CHECK_TTL_SECONDS", "5"))
+
 # Engine configuration based on database type
 if DATABASE_URL.startswith("sqlite"):
     # SQLite configuration
@@ -37,6 +49,44 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Async mode for the hot read endpoints (needs aiosqlite or asyncpg installed)
+ASYNC_DB = os.environ.get("ASYNC_DB", "false").lower() in ("1", "true", "yes")
+
+def async_database_url(url: str):
+    """Map a sync database URL onto its async driver, or None if unsupported"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    for prefix in ("postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return None
+
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DB:
+    ASYNC_DATABASE_URL = async_database_url(DATABASE_URL)
+    if AsyncSession is None or ASYNC_DATABASE_URL is None:
+        logger.error("ASYNC_DB is set but no async driver is available; using the sync engine")
+    else:
+        try:
+            if ASYNC_DATABASE_URL.startswith("sqlite"):
+                async_engine = create_async_engine(ASYNC_DATABASE_URL, echo=False)
+            else:
+                async_engine = create_async_engine(
+                    ASYNC_DATABASE_URL,
+                    pool_pre_ping=True,
+                    pool_recycle=300,
+                    echo=False
+                )
+            AsyncSessionLocal = async_sessionmaker(
+                async_engine,
+                autoflush=False,
+                expire_on_commit=False
+            )
+        except Exception as e:
+            logger.error(f"Async engine unavailable, using the sync engine: {str(e)}")
+            async_engine = None
+
 Base = declarative_base()
 
 def get_db():
@@ -51,14 +101,24 @@ def get_db():
     finally:
         db.close()
 
-def create_tables():
-    """Create all database tables"""
+async def get_read_db():
+    """Session dependency for async read endpoints; async when ASYNC_DB is enabled"""
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    
+    db = SessionLocal()
     try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables created successfully")
-    except Exception as e:
-        logger.error(f"Failed to create tables: {str(e)}")
-        raise
+        yield db
+    finally:
+        await run_in_threadpool(db.close)
+
+async def run_db(db, fn, *args):
+    """Run a sync ORM function `fn(session, *args)` on a session from get_read_db"""
+    if AsyncSession is not None and isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args)
+    return await run_in_threadpool(fn, db, *args)
 
 def drop_tables():
     """Drop all database tables (use with caution)"""
@@ -74,9 +134,35 @@ def check_db_connection():
     """Check if database connection is working"""
     try:
         with engine.connect() as connection:
-            from sqlalchemy import text
             connection.execute(text("SELECT 1"))
         return True
     except Exception as e:
         logger.error(f"Database connection failed: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+
+_db_probe = {"connected": None, "checked_at": 0.0}
+_db_probe_lock = threading.Lock()
+
+async def cached_db_connection() -> tuple:
+    """(connected, seconds since probed), re-probing at most once per HEALTH_CHECK_TTL_SECONDS.
+
+    Only one caller probes at a time; once there is a result the rest get it
+    straight away, so health checks can't pile up on a struggling database
+    or pool. Callers that arrive before the first probe finishes wait for it.
+    """
+    while True:
+        connected, checked_at = _db_probe["connected"], _db_probe["checked_at"]
+        if connected is not None and time.monotonic() - checked_at < HEALTH_CHECK_TTL_SECONDS:
+            return connected, time.monotonic() - checked_at
+        if _db_probe_lock.acquire(blocking=False):
+            break
+        if connected is not None:
+            return connected, time.monotonic() - checked_at
+        await asyncio.sleep(0.01)
+    
+    try:
+        connected = await run_in_threadpool(check_db_connection)
+        _db_probe.update(connected=connected, checked_at=time.monotonic())
+        return connected, 0.0
+    finally:
+        _db_probe_lock.release()
@@ -4,6 +4,7 @@ Safe utility to delete book entries from the database
 """
 
 from typing import List
+import json
 import requests
 import os
 from dotenv import load_dotenv
@@ -53,10 +54,11 @@ class BookDeleter:
         """Get all books from the database"""
 
         try:
-            response = self.session.get(f"{API_BASE_URL}/books")
+            # Stream the admin export rather than paging through /books
+            response = self.session.get(f"{API_BASE_URL}/books/export", params={"format": "ndjson"}, stream=True)
             response.raise_for_status()
 
-            books = response.json()
+            books = [json.loads(line) for line in response.iter_lines() if line]
             return books
 
         except Exception as e:
@@ -91,16 +93,21 @@ class BookDeleter:
             print(f"❌ Failed to delete book {book_id}: {e}")
             return False
 
+    def bulk_delete(self, **selection) -> int:
+        """Soft delete every book matching the selection in one request; returns the count"""
+        try:
+            response = self.session.post(f"{API_BASE_URL}/books/bulk/delete", json=selection)
+            response.raise_for_status()
+            return response.json()["affected_count"]
+
+        except Exception as e:
+            print(f"❌ Bulk delete failed: {e}")
+            return 0
+
     def deleting_multiple_books(self, book_ids: List[int]):
         """Deleting multiple books by their IDs"""
-        success_count = 0
-        failed_count = 0
-
-        for book_id in book_ids:
-            if self.delete_single_book(book_id):
-                success_count += 1
-            else:
-                failed_count += 1
+        success_count = self.bulk_delete(book_ids=book_ids)
+        failed_count = len(set(book_ids)) - success_count
 
         print(f"\n📊 Deletion summary:")
         print(f"   Success: {success_count}")
@@ -147,10 +154,7 @@ class BookDeleter:
                 print("❌ Deletion cancelled")
                 return False
 
-            success_count = 0
-            for book in books_in_category:
-                if self.delete_single_book(book['id']):
-                    success_count += 1
+            success_count = self.bulk_delete(book_ids=[book['id'] for book in books_in_category])
 
             print(f"\n✅ Deleted {success_count} out of {len(books_in_category)} books")
             return True
@@ -179,10 +183,7 @@ class BookDeleter:
                 print("❌ Deletion cancelled")
                 return False
 
-            success_count = 0
-            for book in books:
-                if self.delete_single_book(book['id']):
-                    success_count += 1
+            success_count = self.bulk_delete(book_ids=[book['id'] for book in books])
 
             print(f"\n✅ Deleted {success_count} out of {len(books)} books")
             return True
@@ -215,10 +216,7 @@ class BookDeleter:
                 print("❌ Deletion cancelled")
                 return False
 
-            success_count = 0
-            for book in books:
-                if self.delete_single_book(book['id']):
-                    success_count += 1
+            success_count = self.bulk_delete(book_ids=[book['id'] for book in books])
 
             print(f"\n✅ Deleted {success_count} out of {len(books)} books")
             return True
@@ -0,0 +1,209 @@
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import logging
+import os
+import re
+import threading
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow missing: covers are served as uploaded
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+IMAGES_DIR = "static/images/books"
+VARIANTS_DIR = os.getenv("IMAGE_VARIANTS_DIR", "static/images/variants")
+VARIANT_URL_PREFIX = "/images/variants"
+VARIANT_WIDTHS = tuple(
+    sorted(int(width) for width in os.getenv("IMAGE_VARIANT_WIDTHS", "320,640,960").split(",") if width.strip())
+)
+IMAGE_POOL_SIZE = int(os.getenv("IMAGE_POOL_SIZE", str(max(1, (os.cpu_count() or 2) // 2))))
+SOURCE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff")
+
+# Most compact first, so clients list <source> elements in preference order
+if Image is not None:
+    VARIANT_FORMATS = tuple(fmt for fmt in ("avif", "webp") if features.check(fmt))
+else:
+    VARIANT_FORMATS = ()
+
+VARIANT_NAME_PATTERN = re.compile(r"^(?P<source>[^/\\]+)\.(?P<width>\d+)w\.(?P<format>[a-z]+)$")
+
+# ==================== RENDERING (worker processes) ====================
+
+def variant_name(source: str, width: int, fmt: str) -> str:
+    return f"{source}.{width}w.{fmt}"
+
+def variant_widths(source_width: int, widths: tuple = VARIANT_WIDTHS) -> tuple:
+    """Configured widths narrower than the source, plus the source's own width in place
+    of the ones it would have to be upscaled to"""
+    narrower = tuple(width for width in widths if width < source_width)
+    if len(narrower) < len(widths):
+        narrower += (source_width,)
+    return narrower
+
+def _render_variants(source_path: str, variants_dir: str, widths: tuple, formats: tuple) -> int:
+    """Write every missing or outdated variant of one image; returns how many were written"""
+    source = os.path.basename(source_path)
+    source_mtime = os.path.getmtime(source_path)
+    written = 0
+    with Image.open(source_path) as original:
+        original.load()
+        image = original.convert("RGBA" if original.mode in ("RGBA", "LA", "P") else "RGB")
+        for width in variant_widths(image.width, widths):
+            resized = None
+            for fmt in formats:
+                path = os.path.join(variants_dir, variant_name(source, width, fmt))
+                if os.path.exists(path) and os.path.getmtime(path) >= source_mtime:
+                    continue
+                if resized is None:
+                    if width == image.width:
+                        resized = image
+                    else:
+                        height = max(1, round(image.height * width / image.width))
+                        resized = image.resize((width, height), Image.LANCZOS)
+                # Write then rename so readers never see a partial file
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                resized.save(tmp_path, format=fmt.upper(), quality=75 if fmt == "webp" else 55)
+                os.replace(tmp_path, path)
+                written += 1
+    return written
+
+# ==================== POOL ====================
+
+_executor = None
+_jobs = {}  # source filename -> concurrent Future
+_source_widths = {}  # source path -> (mtime_ns, size, variant widths)
+_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=IMAGE_POOL_SIZE)
+    return _executor
+
+def enabled() -> bool:
+    """Whether variants can be produced (Pillow with at least one output format)"""
+    return bool(VARIANT_FORMATS and VARIANT_WIDTHS)
+
+def is_source_name(filename: str) -> bool:
+    """Whether a cover filename is safe and in a format variants can be made from"""
+    if not filename or os.path.basename(filename) != filename or filename.startswith("."):
+        return False
+    return filename.lower().endswith(SOURCE_EXTENSIONS)
+
+def source_path(filename: str):
+    """Path of an uploaded cover, or None if the name is unsafe, unsupported or missing"""
+    if not is_source_name(filename):
+        return None
+    path = os.path.join(IMAGES_DIR, filename)
+    return path if os.path.isfile(path) else None
+
+def source_widths(path: str, stat_result=None) -> tuple:
+    """Variant widths of a cover, from its dimensions (read from the image header
+    once per version of the file)"""
+    if stat_result is None:
+        stat_result = os.stat(path)
+    cached = _source_widths.get(path)
+    if cached and cached[0] == stat_result.st_mtime_ns and cached[1] == stat_result.st_size:
+        return cached[2]
+    with Image.open(path) as image:  # parses the header, not the pixels
+        widths = variant_widths(image.width)
+    _source_widths[path] = (stat_result.st_mtime_ns, stat_result.st_size, widths)
+    return widths
+
+def _up_to_date(filename: str, path: str) -> bool:
+    source_mtime = os.path.getmtime(path)
+    try:
+        widths = source_widths(path)
+    except OSError:
+        return False  # unreadable: let the worker try, and log why it fails
+    for width in widths:
+        for fmt in VARIANT_FORMATS:
+            variant = os.path.join(VARIANTS_DIR, variant_name(filename, width, fmt))
+            if not (os.path.exists(variant) and os.path.getmtime(variant) >= source_mtime):
+                return False
+    return True
+
+def schedule(filename: str, force: bool = False):
+    """Start generating the variants of a cover in the pool.
+
+    Returns the Future, or None if there is nothing to do (unless `force`,
+    the up-to-date check is done here to avoid a round trip to the pool).
+    """
+    path = source_path(filename) if enabled() else None
+    if path is None or (not force and _up_to_date(filename, path)):
+        return None
+    with _lock:
+        job = _jobs.get(filename)
+        if job is not None:
+            return job
+        os.makedirs(VARIANTS_DIR, exist_ok=True)
+        job = _get_executor().submit(_render_variants, path, VARIANTS_DIR, VARIANT_WIDTHS, VARIANT_FORMATS)
+        _jobs[filename] = job
+    job.add_done_callback(lambda done: _finished(filename, done))
+    return job
+
+def _finished(filename: str, job):
+    with _lock:
+        if _jobs.get(filename) is job:
+            del _jobs[filename]
+    error = job.exception()
+    if error is not None:
+        logger.error(f"Image variants failed for {filename}: {str(error)}")
+
+def schedule_all():
+    """Queue variant generation for every cover already on disk"""
+    if not enabled() or not os.path.isdir(IMAGES_DIR):
+        return 0
+    scheduled = 0
+    for filename in os.listdir(IMAGES_DIR):
+        if schedule(filename) is not None:
+            scheduled += 1
+    return scheduled
+
+async def variant_file(name: str):
+    """(variant path, source path) for a variant on the on-disk cache, rendering it first
+    if needed; None if invalid"""
+    match = VARIANT_NAME_PATTERN.match(name)
+    if not match or not enabled():
+        return None
+    source, width, fmt = match["source"], int(match["width"]), match["format"]
+    if fmt not in VARIANT_FORMATS:
+        return None
+    path = source_path(source)
+    if path is None:
+        return None
+    try:
+        if width not in source_widths(path):
+            return None
+    except OSError:
+        return None
+
+    variant = os.path.join(VARIANTS_DIR, name)
+    if not (os.path.exists(variant) and os.path.getmtime(variant) >= os.path.getmtime(path)):
+        await asyncio.wrap_future(schedule(source, force=True))
+    return variant, path
+
+# ==================== URLS ====================
+
+def srcset(filename: str, version: str = "", stat_result=None):
+    """{format: srcset string} for a cover known to exist, or None when it has no variants.
+
+    `version` is the source's ?v= query (see static_assets.version_query);
+    variants are rendered from the source, so they share its fingerprint.
+    Pass the source's `stat_result` if the caller already has it.
+    """
+    if not enabled() or not is_source_name(filename):
+        return None
+    try:
+        widths = source_widths(os.path.join(IMAGES_DIR, filename), stat_result)
+    except OSError:
+        return None  # missing, or not an image Pillow can read
+    return {
+        fmt: ", ".join(
+            f"{VARIANT_URL_PREFIX}/{variant_name(filename, width, fmt)}{version} {width}w"
+            for width in widths
+        )
+        for fmt in VARIANT_FORMATS
+    }
@@ -1,25 +1,62 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Query
+from fastapi import FastAPI, HTTPException, Depends, status, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import Response, StreamingResponse, FileResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, text, insert, update, case, select
+from datetime import datetime
+from types import SimpleNamespace
 from typing import List, Optional
+import csv
+import hashlib
+import io
+import json
 import logging
 import math
 import os
+import secrets
+import threading
+import time
+import zlib
 
 # Import our organized modules
-from database import get_db, engine, create_tables, check_db_connection
-from models import Book, User, CartItem, Base
+from database import (
+    get_db, get_read_db, run_db, engine, async_engine, cached_db_connection, SessionLocal
+)
+from models import Book, User, CartItem, Base, low_stock
 from schemas import (
     BookCreate, BookResponse, BookUpdate, UserCreate, UserResponse, 
-    UserLogin, CartItemResponse, Token, CartAdd, CartUpdate,
-    PaginatedBooks, CartSummary, BulkBookCreate, BulkOperationResponse
+    UserLogin, Token, CartAdd, CartUpdate,
+    PaginatedBooks, CartSummary, BulkBookCreate, BulkOperationResponse,
+    BookSelection, BulkBookUpdate, BulkMutationResponse, CoverUploadResponse
 )
 from auth import (
     create_access_token, get_current_user, get_current_admin_user,
-    hash_password, verify_password
+    hash_password, hash_password_async, verify_password_async, needs_rehash,
+    invalidate_principal, token_cache_stats
+)
+import password_pool
+from password_pool import PasswordPoolBusy
+import search_index
+import serialization
+import image_variants
+from cover_store import MAX_COVER_BYTES, CoverRejected, CoverTooLarge, CoverWriter
+import static_assets
+from static_assets import AssetStaticFiles
+from compression import COMPRESSION_MIN_BYTES, CompressionMiddleware, negotiate
+import query_stats
+from query_stats import QueryStatsMiddleware
+import metrics
+from metrics import MetricsMiddleware
+from pagination import SORT_COLUMNS, encode_cursor, decode_cursor, keyset_condition
+from cache import (
+    CachedBody, count_cache, response_cache, response_cache_key,
+    get_catalog_version, bump_catalog_version
 )
+from autocomplete import autocomplete_index
+from migrations import run_migrations
+from catalog_import import IMPORT_FORMATS, ImportRowError, ImportProgressResponse, iter_records
+from pydantic import ValidationError
 
 # Configure logging
 logging.basicConfig(
@@ -28,9 +65,12 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Create database tables
+# Create database tables and apply pending schema migrations
 try:
-    create_tables()
+    applied = run_migrations()
+    if applied:
+        logger.info(f"✅ Applied migrations: {', '.join(str(version) for version in applied)}")
+    search_index.create_search_index()
     logger.info("✅ Database initialized successfully")
 except Exception as e:
     logger.error(f"❌ Database initialization error: {str(e)}")
@@ -41,7 +81,8 @@ app = FastAPI(
     description="API for Hindi Literature Bookstore with Image Support",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=serialization.DefaultResponse
 )
 
 # Create static directory if it doesn't exist
@@ -51,42 +92,426 @@ try:
 except Exception as e:
     logger.warning(f"⚠️  Static directory warning: {str(e)}")
 
+# Render missing cover variants in the background
+try:
+    scheduled = image_variants.schedule_all()
+    if scheduled:
+        logger.info(f"✅ Queued image variants for {scheduled} covers")
+except Exception as e:
+    logger.warning(f"⚠️  Image variant warning: {str(e)}")
+
 # Mount static files for images
 try:
-    app.mount("/static", StaticFiles(directory="static"), name="static")
+    compressed = static_assets.precompress("static")
+    if compressed:
+        logger.info(f"✅ Precompressed {compressed} static assets")
+    app.mount("/static", AssetStaticFiles(directory="static"), name="static")
 except Exception as e:
     logger.warning(f"⚠️  Static files mount warning: {str(e)}")
 
+# Compress text responses that aren't already encoded
+app.add_middleware(CompressionMiddleware)
+
+# Per-request SQL counts and timings, with N+1 warnings
+query_stats.instrument(engine)
+if async_engine is not None:
+    query_stats.instrument(async_engine.sync_engine)
+app.add_middleware(QueryStatsMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # For development - restrict in production
     allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-DB-Queries", "X-DB-Time", "Server-Timing"],
 )
 
+# Outermost, so latency covers every other middleware
+app.add_middleware(MetricsMiddleware)
+
+# If set, /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+BULK_INSERT_CHUNK_SIZE = int(os.getenv("BULK_INSERT_CHUNK_SIZE", "500"))
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", str(BULK_INSERT_CHUNK_SIZE)))
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+# How often /search picks up book writes made by other processes
+AUTOCOMPLETE_SYNC_SECONDS = float(os.getenv("AUTOCOMPLETE_SYNC_SECONDS", "10"))
+
 # ==================== UTILITY FUNCTIONS ====================
 
-def get_image_url(image_filename: Optional[str]) -> Optional[str]:
-    """Convert image filename to full URL"""
+def cover_urls(image_filename: Optional[str]) -> tuple:
+    """(image URL, srcset) for a cover, from a single stat of the file"""
     if not image_filename:
+        return None, None
+    url = f"/static/images/books/{image_filename}"
+    if os.path.basename(image_filename) != image_filename:
+        return url, None
+    path = os.path.join(image_variants.IMAGES_DIR, image_filename)
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return url, None
+    # Pin the URLs to the file's content so browsers can cache them for good
+    version = static_assets.version_query(path, stat_result)
+    return url + version, image_variants.srcset(image_filename, version, stat_result)
+
+def render_json(payload) -> bytes:
+    """Render a trusted response payload (plain dicts/lists built from DB rows) to JSON bytes"""
+    return serialization.dumps(payload)
+
+# Everything a BookResponse needs, read as plain column tuples
+BOOK_COLUMNS = (
+    Book.id, Book.title, Book.author, Book.description, Book.category, Book.price,
+    Book.image_url, Book.stock_quantity, Book.is_available, Book.created_at
+)
+
+# Output fields a client can pick with ?fields=, and the column each one reads
+BOOK_FIELD_COLUMNS = {
+    "id": Book.id,
+    "title": Book.title,
+    "author": Book.author,
+    "description": Book.description,
+    "summary": Book.summary,
+    "category": Book.category,
+    "price": Book.price,
+    "image_url": Book.image_url,
+    "image_srcset": Book.image_url,
+    "stock_quantity": Book.stock_quantity,
+    "is_available": Book.is_available,
+    "created_at": Book.created_at,
+}
+ALL_BOOK_FIELDS = tuple(BOOK_FIELD_COLUMNS)
+DEFAULT_BOOK_FIELDS = tuple(name for name in ALL_BOOK_FIELDS if name != "summary")
+
+def parse_fields(fields: Optional[str]) -> Optional[tuple]:
+    """Validate a ?fields= list into canonical order (id always included); None means the default book"""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - BOOK_FIELD_COLUMNS.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return tuple(name for name in ALL_BOOK_FIELDS if name in requested)
+
+def field_columns(fields: Optional[tuple], *extra) -> tuple:
+    """Columns to SELECT for the requested fields, plus any extra columns"""
+    if fields is None:
+        columns = {column.key: column for column in BOOK_COLUMNS}
+    else:
+        columns = {BOOK_FIELD_COLUMNS[name].key: BOOK_FIELD_COLUMNS[name] for name in fields}
+    for column in extra:
+        columns.setdefault(column.key, column)
+    return tuple(columns.values())
+
+def select_books(*conditions, columns=BOOK_COLUMNS):
+    """SELECT of column tuples for read-only book lists.
+
+    Rows come back as lightweight Row tuples (attribute access by column
+    name, so book_payload accepts them) with no ORM instances, identity map
+    or attribute instrumentation behind them.
+    """
+    return select(*columns).where(*conditions)
+
+def book_payload(book, fields: Optional[tuple] = None) -> dict:
+    """Serialize a Book or a BOOK_COLUMNS row in the BookResponse shape without a validation pass.
+
+    With `fields`, only those keys are emitted (the row needs just their columns).
+    """
+    if fields is not None:
+        payload = {}
+        image_url = image_srcset = None
+        if "image_url" in fields or "image_srcset" in fields:
+            image_url, image_srcset = cover_urls(book.image_url)
+        for name in fields:
+            if name == "image_url":
+                payload[name] = image_url
+            elif name == "image_srcset":
+                payload[name] = image_srcset
+            else:
+                payload[name] = getattr(book, name)
+        return payload
+    image_url, image_srcset = cover_urls(book.image_url)
+    return {
+        "id": book.id,
+        "title": book.title,
+        "author": book.author,
+        "description": book.description,
+        "category": book.category,
+        "price": book.price,
+        "image_url": image_url,
+        "image_srcset": image_srcset,
+        "stock_quantity": book.stock_quantity,
+        "is_available": book.is_available,
+        "created_at": book.created_at
+    }
+
+def json_response(cached: CachedBody, request: Request) -> Response:
+    """Response for a cached body, compressed from the entry's stored encodings when accepted"""
+    headers = {}
+    if cached.etag:
+        headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    body = cached.body
+    if len(body) >= COMPRESSION_MIN_BYTES:
+        headers["Vary"] = "Accept-Encoding"
+        encoding = negotiate(request.headers)
+        if encoding:
+            body = cached.encode(encoding)
+            headers["Content-Encoding"] = encoding
+            if cached.etag:
+                headers["ETag"] = f"W/{cached.etag}"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def content_etag(body: bytes) -> str:
+    """Strong ETag derived from a rendered body, so it changes whenever the data does"""
+    return f'"c{hashlib.sha1(body).hexdigest()[:16]}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match header already names this ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+def catalog_changed(*book_ids: int):
+    """Invalidate cached catalog data after a committed book write"""
+    bump_catalog_version()
+    tags = ["books", "categories", "search"]
+    tags.extend(f"book:{book_id}" for book_id in book_ids)
+    response_cache.invalidate(*tags)
+
+def validate_new_book(book: BookCreate) -> Optional[str]:
+    """Check a BookCreate against the column constraints; returns an error message or None"""
+    for field, max_length in (("title", 200), ("author", 100), ("category", 50), ("image_url", 255)):
+        value = getattr(book, field)
+        if field != "image_url" and not value.strip():
+            return f"{field} cannot be empty"
+        if len(value) > max_length:
+            return f"{field} is longer than {max_length} characters"
+    if book.price < 0:
+        return "price cannot be negative"
+    if book.stock_quantity is not None and book.stock_quantity < 0:
+        return "stock_quantity cannot be negative"
+    return None
+
+def insert_books(db: Session, books: List[BookCreate]) -> tuple:
+    """Insert books in chunked multi-row INSERTs within the caller's transaction.
+
+    Each chunk runs in a savepoint; if a chunk fails it is retried row by row
+    so one bad row doesn't sink its neighbours. Returns (created rows with
+    their ids, error messages). The caller commits.
+    """
+    errors = []
+    pending = []
+    now = datetime.utcnow()
+    for book in books:
+        error = validate_new_book(book)
+        if error:
+            errors.append(f"Failed to create '{book.title}': {error}")
+            continue
+        row = book.dict()
+        row.update(is_available=True, created_at=now, updated_at=now)
+        pending.append(row)
+    
+    if not pending:
+        return [], errors
+    
+    # RETURNING the inserted values along with the id means rows needn't come back
+    # in parameter order, which SQLite can't promise for a multi-row INSERT; asking
+    # for that order makes SQLAlchemy fall back to one INSERT per row there
+    returned = [Book.id, Book.summary, *(getattr(Book, key) for key in pending[0])]
+    statement = insert(Book).returning(*returned)
+    created = []
+    for start in range(0, len(pending), BULK_INSERT_CHUNK_SIZE):
+        chunk = pending[start:start + BULK_INSERT_CHUNK_SIZE]
+        try:
+            with db.begin_nested():
+                rows = [dict(row._mapping) for row in db.execute(statement, chunk)]
+                rows.sort(key=lambda row: row["id"])
+                search_index.index_new_books(db, rows)
+            created.extend(rows)
+            continue
+        except Exception:
+            pass
+        
+        # Isolate the failing rows
+        for row in chunk:
+            try:
+                with db.begin_nested():
+                    created_row = dict(db.execute(statement, [row]).one()._mapping)
+                    search_index.index_new_books(db, [created_row])
+                created.append(created_row)
+            except Exception as e:
+                errors.append(f"Failed to create '{row['title']}': {str(e)}")
+    
+    return created, errors
+
+def count_cache_key(category, search, min_price, max_price) -> tuple:
+    """Normalize listing filters so equivalent requests share a cached total"""
+    return (
+        category,
+        tuple(search_index.tokenize(search)) if search else None,
+        float(min_price) if min_price is not None else None,
+        float(max_price) if max_price is not None else None,
+    )
+
+def estimate_count(db: Session, query) -> Optional[int]:
+    """Planner row estimate for a SELECT (PostgreSQL only)"""
+    if engine.dialect.name != "postgresql":
+        return None
+    sql = query.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+def listing_total(db: Session, query, key: tuple, mode: str) -> Optional[int]:
+    """Total for a filtered listing according to the requested count mode"""
+    if mode == "none":
         return None
-    return f"/static/images/books/{image_filename}"
+    
+    total = count_cache.get(key, allow_stale=(mode == "estimate"))
+    if total is not None:
+        return total
+    
+    version = get_catalog_version()
+    if mode == "estimate":
+        total = estimate_count(db, query)
+        if total is not None:
+            return total
+    
+    total = db.execute(select(func.count()).select_from(query.subquery())).scalar_one()
+    count_cache.set(key, total, version)
+    return total
+
+# Column values kept per indexed book, enough for book_payload to render any ?fields=
+AUTOCOMPLETE_COLUMNS = tuple(column.key for column in field_columns(ALL_BOOK_FIELDS))
+
+def autocomplete_entry(book) -> SimpleNamespace:
+    """Raw column values for the autocomplete index; book_payload renders them (and the
+    cover URLs) only for the books a search returns"""
+    return SimpleNamespace(**{name: getattr(book, name) for name in AUTOCOMPLETE_COLUMNS})
+
+def refresh_autocomplete(book: Book):
+    """Mirror a committed book write into the autocomplete index"""
+    if book.is_available:
+        autocomplete_index.add(book.id, book.title, book.author, autocomplete_entry(book))
+    else:
+        autocomplete_index.remove(book.id)
+
+# Newest updated_at the autocomplete index has seen, and when it last checked for more
+autocomplete_sync = {"watermark": None, "checked_at": 0.0}
+autocomplete_sync_lock = threading.Lock()
+
+def build_autocomplete_index(db: Session):
+    """Rebuild the autocomplete index from all available books"""
+    watermark = db.execute(select(func.max(Book.updated_at))).scalar()
+    books = db.execute(
+        select_books(Book.is_available == True, columns=field_columns(ALL_BOOK_FIELDS))
+        .execution_options(yield_per=1000)
+    )
+    autocomplete_index.rebuild(
+        (book.id, book.title, book.author, autocomplete_entry(book)) for book in books
+    )
+    autocomplete_sync["watermark"] = watermark
+
+def load_autocomplete_index():
+    """Build the autocomplete index at startup"""
+    db = SessionLocal()
+    try:
+        build_autocomplete_index(db)
+        autocomplete_sync["checked_at"] = time.monotonic()
+        logger.info(f"✅ Autocomplete index built with {len(autocomplete_index)} books")
+    finally:
+        db.close()
+
+def sync_autocomplete(db: Session) -> bool:
+    """Apply book writes made outside this process since the last sync; returns whether any were found"""
+    watermark = autocomplete_sync["watermark"]
+    conditions = [Book.updated_at >= watermark] if watermark else []
+    books = db.execute(select_books(*conditions, columns=field_columns(ALL_BOOK_FIELDS, Book.updated_at))).all()
+    for book in books:
+        refresh_autocomplete(book)
+    stamps = [book.updated_at for book in books if book.updated_at]
+    newest = max(stamps, default=watermark)
+    changed = newest != watermark
+    
+    # Rows deleted outright (rather than soft deleted) leave no updated_at behind
+    available = db.execute(select(func.count()).select_from(Book).where(Book.is_available == True)).scalar_one()
+    if available != len(autocomplete_index):
+        build_autocomplete_index(db)
+        return True
+    autocomplete_sync["watermark"] = newest
+    return changed
+
+async def reconcile_autocomplete(db):
+    """Run sync_autocomplete at most once per AUTOCOMPLETE_SYNC_SECONDS, one caller at a time"""
+    if not autocomplete_index.ready:
+        return
+    if time.monotonic() - autocomplete_sync["checked_at"] < AUTOCOMPLETE_SYNC_SECONDS:
+        return
+    if not autocomplete_sync_lock.acquire(blocking=False):
+        return
+    try:
+        autocomplete_sync["checked_at"] = time.monotonic()
+        if await run_db(db, sync_autocomplete):
+            response_cache.invalidate("search")
+    except Exception as e:
+        logger.error(f"Autocomplete sync failed: {str(e)}")
+    finally:
+        autocomplete_sync_lock.release()
+
+try:
+    load_autocomplete_index()
+except Exception as e:
+    logger.error(f"❌ Autocomplete index error: {str(e)}")
 
 # ==================== HEALTH & ROOT ENDPOINTS ====================
 
 @app.get("/health")
-def health_check():
-    """Health check endpoint"""
-    db_status = check_db_connection()
+async def health_check():
+    """Health check endpoint (database probe cached for HEALTH_CHECK_TTL_SECONDS)"""
+    db_status, probe_age = await cached_db_connection()
     return {
         "status": "healthy" if db_status else "unhealthy",
         "database": "connected" if db_status else "disconnected",
+        "database_checked_seconds_ago": round(probe_age, 1),
         "static_files": os.path.exists("static/images/books"),
         "version": "2.0.0"
     }
 
+def app_metrics(out: metrics.Exposition):
+    """App-specific families for /metrics"""
+    pool = password_pool.stats()
+    out.family("password_pool_in_flight", "gauge", "bcrypt jobs queued or running")
+    out.sample("password_pool_in_flight", pool["in_flight"])
+    out.family("password_pool_rejected_total", "counter", "bcrypt jobs refused because the queue was full")
+    out.sample("password_pool_rejected_total", pool["rejected"])
+    out.family("catalog_version", "gauge", "Catalog writes seen by this process")
+    out.sample("catalog_version", get_catalog_version())
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    """Prometheus metrics for this process"""
+    if METRICS_TOKEN and not secrets.compare_digest(
+        request.headers.get("authorization", "").encode(), f"Bearer {METRICS_TOKEN}".encode()
+    ):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    engines = {"sync": engine}
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+    caches = {
+        "response": response_cache.stats(),
+        "count": count_cache.stats(),
+        "token": token_cache_stats(),
+    }
+    return Response(metrics.render(engines, caches, app_metrics), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/")
 def read_root():
     """Root endpoint"""
@@ -99,107 +524,304 @@ def read_root():
         "static_files": "/static"
     }
 
-# ==================== BOOK ENDPOINTS ====================
+# ==================== CATALOG QUERIES ====================
 
-@app.get("/books", response_model=PaginatedBooks)
-def get_books(
-    page: int = Query(1, ge=1, description="Page number"),
-    per_page: int = Query(12, ge=1, le=50, description="Items per page"),
-    category: Optional[str] = Query(None, description="Filter by category"),
-    search: Optional[str] = Query(None, description="Search in title or author"),
-    min_price: Optional[float] = Query(None, ge=0, description="Minimum price filter"),
-    max_price: Optional[float] = Query(None, ge=0, description="Maximum price filter"),
-    sort_by: Optional[str] = Query("created_at", description="Sort by: title, author, price, created_at"),
-    sort_order: Optional[str] = Query("desc", description="Sort order: asc, desc"),
-    db: Session = Depends(get_db)
-):
-    """Get books with pagination, filtering, and sorting"""
-    try:
-        # Build query
-        query = db.query(Book).filter(Book.is_available == True)
-        
-        # Apply filters
-        if category:
-            query = query.filter(Book.category == category)
-        if search:
-            search_term = f"%{search}%"
+def book_filters(
+    category: Optional[str], search: Optional[str],
+    min_price: Optional[float], max_price: Optional[float]
+) -> list:
+    """WHERE conditions for the catalog listing filters (available books only)"""
+    conditions = [Book.is_available == True]
+    if category:
+        conditions.append(Book.category == category)
+    if search:
+        conditions.append(search_index.search_condition(search))
+    if min_price is not None:
+        conditions.append(Book.price >= min_price)
+    if max_price is not None:
+        conditions.append(Book.price <= max_price)
+    return conditions
+
+def query_books_page(
+    db: Session, page: int, per_page: int, category: Optional[str], search: Optional[str],
+    min_price: Optional[float], max_price: Optional[float], sort_by: Optional[str],
+    sort_order: Optional[str], cursor: Optional[str], count: str, fields: Optional[tuple] = None
+) -> dict:
+    """Load one page of the book listing"""
+    if cursor is not None:
+        # Normalize first: the sort column is selected and encoded into every cursor
+        if sort_by not in SORT_COLUMNS:
+            sort_by = "created_at"
+        if sort_order != "desc":
+            sort_order = "asc"
+    # Build query; cursors are built from the sort column, so it is always selected
+    extra = (getattr(Book, sort_by),) if cursor is not None else ()
+    query = select_books(
+        *book_filters(category, search, min_price, max_price), columns=field_columns(fields, *extra)
+    )
+    
+    # Get total count (cached per filter set until the catalog changes)
+    total = listing_total(db, query, count_cache_key(category, search, min_price, max_price), count)
+    
+    next_cursor = None
+    prev_cursor = None
+    if cursor is not None:
+        # Keyset pagination: seek past the cursor row instead of skipping rows
+        sort_column = getattr(Book, sort_by)
+        descending = sort_order == "desc"
+        direction = "next"
+        
+        if cursor:
+            position = decode_cursor(cursor, sort_by, sort_order)
+            direction = position["d"]
+            # Paging backwards scans in the opposite order and flips the page afterwards
+            if direction == "prev":
+                descending = not descending
             query = query.filter(
-                (Book.title.ilike(search_term)) | 
-                (Book.author.ilike(search_term)) |
-                (Book.description.ilike(search_term))
+                keyset_condition(sort_column, Book.id, position["v"], position["id"], descending)
             )
-        if min_price is not None:
-            query = query.filter(Book.price >= min_price)
-        if max_price is not None:
-            query = query.filter(Book.price <= max_price)
         
+        if descending:
+            query = query.order_by(sort_column.desc(), Book.id.desc())
+        else:
+            query = query.order_by(sort_column.asc(), Book.id.asc())
+        
+        books = db.execute(query.limit(per_page + 1)).all()
+        has_more = len(books) > per_page
+        books = books[:per_page]
+        if direction == "prev":
+            books.reverse()
+        
+        if books:
+            if has_more or direction == "prev":
+                last = books[-1]
+                next_cursor = encode_cursor(sort_by, sort_order, getattr(last, sort_by), last.id, "next")
+            if (has_more and direction == "prev") or (cursor and direction == "next"):
+                first = books[0]
+                prev_cursor = encode_cursor(sort_by, sort_order, getattr(first, sort_by), first.id, "prev")
+    else:
         # Apply sorting
-        if sort_by in ["title", "author", "price", "created_at"]:
+        if sort_by in SORT_COLUMNS:
             sort_column = getattr(Book, sort_by)
             if sort_order == "desc":
                 query = query.order_by(sort_column.desc())
             else:
                 query = query.order_by(sort_column.asc())
         
-        # Get total count
-        total = query.count()
-        
         # Apply pagination
         skip = (page - 1) * per_page
-        books = query.offset(skip).limit(per_page).all()
-        
-        # Calculate total pages
+        books = db.execute(query.offset(skip).limit(per_page)).all()
+    
+    # Calculate total pages
+    if total is None:
+        pages = None
+    else:
         pages = math.ceil(total / per_page) if total > 0 else 1
-        
-        return PaginatedBooks(
-            books=[
-                {
-                    "id": book.id,
-                    "title": book.title,
-                    "author": book.author,
-                    "description": book.description,
-                    "category": book.category,
-                    "price": book.price,
-                    "image_url": get_image_url(book.image_url),
-                    "stock_quantity": book.stock_quantity,
-                    "is_available": book.is_available,
-                    "created_at": book.created_at
-                }
-                for book in books
-            ],
-            total=total,
-            page=page,
-            per_page=per_page,
-            pages=pages
+    
+    # Shaped like PaginatedBooks; rows come from our own DB so they aren't re-validated
+    return {
+        "books": [book_payload(book, fields) for book in books],
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "pages": pages,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor
+    }
+
+def query_book(db: Session, book_id: int, fields: Optional[tuple] = None) -> Optional[dict]:
+    """Load a single available book payload, or None if missing"""
+    book = db.execute(select_books(
+        Book.id == book_id, Book.is_available == True, columns=field_columns(fields)
+    )).first()
+    if not book:
+        return None
+    return book_payload(book, fields)
+
+def query_categories(db: Session) -> list:
+    """Load available categories with their book counts"""
+    categories = db.query(
+        Book.category, 
+        func.count(Book.id).label('count')
+    ).filter(
+        Book.is_available == True
+    ).group_by(Book.category).all()
+    
+    return [{"name": cat[0], "count": cat[1]} for cat in categories if cat[0]]
+
+def query_search_results(db: Session, q: str, limit: int, fields: Optional[tuple] = None) -> list:
+    """Autocomplete results from the full-text index"""
+    books = db.execute(select_books(
+        Book.is_available == True,
+        search_index.search_condition(q, columns=("title", "author")),
+        columns=field_columns(fields)
+    ).limit(limit)).all()
+    return [book_payload(book, fields) for book in books]
+
+# ==================== BOOK ENDPOINTS ====================
+
+@app.get("/books", response_model=PaginatedBooks)
+async def get_books(
+    request: Request,
+    page: int = Query(1, ge=1, description="Page number"),
+    per_page: int = Query(12, ge=1, le=50, description="Items per page"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    search: Optional[str] = Query(None, description="Search in title or author"),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum price filter"),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum price filter"),
+    sort_by: Optional[str] = Query("created_at", description="Sort by: title, author, price, created_at"),
+    sort_order: Optional[str] = Query("desc", description="Sort order: asc, desc"),
+    cursor: Optional[str] = Query(None, description="Keyset pagination cursor; pass an empty value for the first page"),
+    count: str = Query("exact", pattern="^(exact|estimate|none)$", description="Total count mode: exact, estimate, none"),
+    fields: Optional[str] = Query(None, description="Comma-separated book fields to return, e.g. id,title,summary,price,image_url"),
+    db=Depends(get_read_db)
+):
+    """Get books with pagination, filtering, and sorting"""
+    fields = parse_fields(fields)
+    cache_key = response_cache_key(
+        "/books", page=page, per_page=per_page, category=category, search=search,
+        min_price=min_price, max_price=max_price, sort_by=sort_by, sort_order=sort_order,
+        cursor=cursor, count=count, fields=fields
+    )
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        if etag_matches(request, cached.etag):
+            return not_modified(cached.etag)
+        return json_response(cached, request)
+    version = get_catalog_version()
+    
+    try:
+        result = await run_db(
+            db, query_books_page, page, per_page, category, search,
+            min_price, max_price, sort_by, sort_order, cursor, count, fields
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching books: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
+    body = render_json(result)
+    etag = content_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    cached = response_cache.set(cache_key, body, ("books",), version, etag)
+    return json_response(cached, request)
+
+EXPORT_COLUMNS = tuple(column.key for column in BOOK_COLUMNS)
+
+def export_chunks(
+    fmt: str, compress: bool, category: Optional[str], search: Optional[str],
+    min_price: Optional[float], max_price: Optional[float]
+):
+    """Yield the export body in ~64 KB chunks from a server-side cursor.
+
+    Runs in the threadpool with its own session, since the request's session
+    is closed before a streaming body is sent.
+    """
+    db = SessionLocal()
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    
+    def drain() -> bytes:
+        data = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+    
+    try:
+        if writer:
+            writer.writerow(EXPORT_COLUMNS)
+        statement = (
+            select_books(*book_filters(category, search, min_price, max_price))
+            .order_by(Book.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for row in db.execute(statement):
+            if writer:
+                writer.writerow(row)
+            else:
+                record = dict(zip(EXPORT_COLUMNS, row))
+                record["created_at"] = record["created_at"].isoformat() if record["created_at"] else None
+                buffer.write(json.dumps(record, ensure_ascii=False))
+                buffer.write("\n")
+            if buffer.tell() >= 65536:
+                chunk = drain()
+                if chunk:
+                    yield chunk
+        chunk = drain()
+        if compressor:
+            chunk += compressor.flush()
+        if chunk:
+            yield chunk
+    except Exception as e:
+        # Headers are already sent; the truncated body is all the client will see
+        logger.error(f"Error exporting books: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+@app.get("/books/export")
+def export_books(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    search: Optional[str] = Query(None, description="Search in title, author, description"),
+    min_price: Optional[float] = Query(None, ge=0, description="Minimum price"),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum price"),
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """Stream every available book matching the filters as NDJSON or CSV (Admin only).
+
+    image_url holds the stored filename, so an export can be fed back to
+    POST /books/import. The body is gzipped when the client accepts it.
+    """
+    # Streamed through zlib, so gzip is the only coding on offer
+    compress = "gzip" in static_assets.accepted_encodings(request.headers)
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    filename = f"books-{datetime.utcnow():%Y%m%d-%H%M%S}.{'csv' if format == 'csv' else 'ndjson'}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Vary": "Accept-Encoding"}
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    logger.info(f"Catalog export ({format}) started by admin {current_user['sub']}")
+    return StreamingResponse(
+        export_chunks(format, compress, category, search, min_price, max_price),
+        media_type=media_type,
+        headers=headers
+    )
 
 @app.get("/books/{book_id}", response_model=BookResponse)
-def get_book(book_id: int, db: Session = Depends(get_db)):
+async def get_book(
+    book_id: int,
+    request: Request,
+    fields: Optional[str] = Query(None, description="Comma-separated book fields to return"),
+    db=Depends(get_read_db)
+):
     """Get single book by ID"""
+    fields = parse_fields(fields)
+    cache_key = response_cache_key("/books/{book_id}", book_id=book_id, fields=fields)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        if etag_matches(request, cached.etag):
+            return not_modified(cached.etag)
+        return json_response(cached, request)
+    version = get_catalog_version()
+    
     try:
-        book = db.query(Book).filter(Book.id == book_id, Book.is_available == True).first()
-        if not book:
-            raise HTTPException(status_code=404, detail="Book not found")
-        return {
-            "id": book.id,
-            "title": book.title,
-            "author": book.author,
-            "description": book.description,
-            "category": book.category,
-            "price": book.price,
-            "image_url": get_image_url(book.image_url),
-            "stock_quantity": book.stock_quantity,
-            "is_available": book.is_available,
-            "created_at": book.created_at
-        }
-    except HTTPException:
-        raise
+        result = await run_db(db, query_book, book_id, fields)
     except Exception as e:
         logger.error(f"Error fetching book {book_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
+    if not result:
+        raise HTTPException(status_code=404, detail="Book not found")
+    
+    # Hashed from the body so a replaced cover (new ?v= fingerprint) changes it too
+    body = render_json(result)
+    etag = content_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    cached = response_cache.set(cache_key, body, (f"book:{book_id}",), version, etag)
+    return json_response(cached, request)
 
 @app.post("/books", response_model=BookResponse, status_code=status.HTTP_201_CREATED)
 def create_book(
@@ -211,8 +833,13 @@ def create_book(
     try:
         db_book = Book(**book.dict())
         db.add(db_book)
+        db.flush()
+        search_index.index_book(db, db_book)
         db.commit()
         db.refresh(db_book)
+        refresh_autocomplete(db_book)
+        image_variants.schedule(db_book.image_url)
+        catalog_changed()
         logger.info(f"Book created: {db_book.title} by admin {current_user['sub']}")
         return db_book
     except Exception as e:
@@ -226,34 +853,220 @@ def create_books_bulk(
     current_user: dict = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    """Create multiple books at once (Admin only)"""
-    success_count = 0
-    failed_count = 0
-    errors = []
-    
+    """Create multiple books at once in a single transaction (Admin only)"""
     try:
-        for book_data in bulk_books.books:
-            try:
-                db_book = Book(**book_data.dict())
-                db.add(db_book)
-                db.commit()
-                db.refresh(db_book)
-                success_count += 1
-            except Exception as e:
-                failed_count += 1
-                errors.append(f"Failed to create '{book_data.title}': {str(e)}")
-                db.rollback()
+        created, errors = insert_books(db, bulk_books.books)
+        db.commit()
         
-        logger.info(f"Bulk create: {success_count} success, {failed_count} failed by admin {current_user['sub']}")
+        for row in created:
+            refresh_autocomplete(Book(**row))
+            image_variants.schedule(row["image_url"])
+        if created:
+            catalog_changed()
+        logger.info(f"Bulk create: {len(created)} success, {len(errors)} failed by admin {current_user['sub']}")
         return BulkOperationResponse(
-            success_count=success_count,
-            failed_count=failed_count,
-            errors=errors
+            success_count=len(created),
+            failed_count=len(errors),
+            errors=errors,
+            created_ids=[row["id"] for row in created]
         )
     except Exception as e:
+        db.rollback()
         logger.error(f"Error in bulk create: {str(e)}")
         raise HTTPException(status_code=500, detail="Bulk operation failed")
 
+IMPORT_OPTIONAL_FIELDS = frozenset(
+    name for name, field in BookCreate.model_fields.items() if not field.is_required()
+)
+
+def import_batch(books: List[BookCreate]) -> tuple:
+    """Insert and commit one import batch in its own session"""
+    db = SessionLocal()
+    try:
+        created, errors = insert_books(db, books)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    
+    for row in created:
+        refresh_autocomplete(Book(**row))
+        image_variants.schedule(row["image_url"])
+    if created:
+        catalog_changed()
+    return created, errors
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+@app.post("/books/import")
+async def import_books(
+    request: Request,
+    format: Optional[str] = Query(None, description="ndjson or csv; defaults from Content-Type"),
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """Stream an NDJSON or CSV catalog in and write it in batches (Admin only).
+
+    Responds with one NDJSON progress line per committed batch and a final
+    summary line. Each batch commits on its own, so rows before a failure stay.
+    """
+    fmt = (format or "").lower()
+    if not fmt:
+        content_type = request.headers.get("content-type", "")
+        fmt = "csv" if "csv" in content_type else "ndjson"
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(IMPORT_FORMATS)}")
+    
+    admin = current_user["sub"]
+    
+    async def progress():
+        batch = []
+        batch_errors = []
+        batch_number = 0
+        totals = {"rows": 0, "created": 0, "failed": 0}
+        
+        async def flush():
+            nonlocal batch, batch_errors, batch_number
+            batch_number += 1
+            created, errors = await run_in_threadpool(import_batch, batch) if batch else ([], [])
+            errors = batch_errors + errors
+            totals["created"] += len(created)
+            totals["failed"] += len(errors)
+            line = {
+                "batch": batch_number,
+                "created": len(created),
+                "failed": len(errors),
+                "errors": errors,
+                "totals": dict(totals),
+            }
+            batch, batch_errors = [], []
+            return json.dumps(line, ensure_ascii=False) + "\n"
+        
+        try:
+            async for line_number, record in iter_records(request.stream(), fmt, IMPORT_OPTIONAL_FIELDS):
+                totals["rows"] += 1
+                if isinstance(record, ImportRowError):
+                    batch_errors.append(f"Line {record.line}: {str(record)}")
+                else:
+                    try:
+                        batch.append(BookCreate(**record))
+                    except ValidationError as e:
+                        batch_errors.append(f"Line {line_number}: {validation_message(e)}")
+                if len(batch) + len(batch_errors) >= IMPORT_BATCH_SIZE:
+                    yield await flush()
+            if batch or batch_errors:
+                yield await flush()
+        except Exception as e:
+            logger.error(f"Error in catalog import by admin {admin}: {str(e)}")
+            yield json.dumps({"error": "Import aborted", **totals}) + "\n"
+            return
+        
+        logger.info(f"Catalog import: {totals['created']} created, {totals['failed']} failed by admin {admin}")
+        yield json.dumps({"done": True, **totals}) + "\n"
+    
+    return ImportProgressResponse(progress(), media_type="application/x-ndjson")
+
+def selection_filters(selection: BookSelection) -> list:
+    """WHERE conditions for a bulk mutation; refuses an empty selection"""
+    conditions = book_filters(
+        selection.category, selection.search, selection.min_price, selection.max_price
+    )
+    if selection.book_ids is not None:
+        conditions.append(Book.id.in_(selection.book_ids))
+    elif len(conditions) == 1:
+        raise HTTPException(status_code=400, detail="Provide book_ids or at least one filter")
+    return conditions
+
+@app.patch("/books/bulk", response_model=BulkMutationResponse)
+def update_books_bulk(
+    changes: BulkBookUpdate,
+    current_user: dict = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Reprice or restock every selected book in one UPDATE (Admin only)"""
+    values = {}
+    if changes.price is not None and changes.price_change_percent is not None:
+        raise HTTPException(status_code=400, detail="Use either price or price_change_percent")
+    if changes.stock_quantity is not None and changes.stock_change is not None:
+        raise HTTPException(status_code=400, detail="Use either stock_quantity or stock_change")
+    
+    if changes.price is not None:
+        if changes.price < 0:
+            raise HTTPException(status_code=400, detail="price cannot be negative")
+        values["price"] = changes.price
+    elif changes.price_change_percent is not None:
+        if changes.price_change_percent < -100:
+            raise HTTPException(status_code=400, detail="price_change_percent cannot be below -100")
+        values["price"] = func.round(Book.price * (1 + changes.price_change_percent / 100), 2)
+    
+    if changes.stock_quantity is not None:
+        if changes.stock_quantity < 0:
+            raise HTTPException(status_code=400, detail="stock_quantity cannot be negative")
+        values["stock_quantity"] = changes.stock_quantity
+    elif changes.stock_change is not None:
+        # Stock never goes below zero
+        adjusted = func.coalesce(Book.stock_quantity, 0) + changes.stock_change
+        values["stock_quantity"] = case((adjusted < 0, 0), else_=adjusted)
+    
+    if not values:
+        raise HTTPException(status_code=400, detail="No changes given")
+    values["updated_at"] = datetime.utcnow()
+    
+    conditions = selection_filters(changes)
+    try:
+        # Plain rows rather than Book instances: commit would expire those and
+        # refresh_autocomplete would then reload each one
+        books = db.execute(
+            update(Book).where(*conditions).values(**values).returning(*field_columns(ALL_BOOK_FIELDS)),
+            execution_options={"synchronize_session": False}
+        ).all()
+        db.commit()
+        
+        for book in books:
+            refresh_autocomplete(book)
+        book_ids = [book.id for book in books]
+        if book_ids:
+            catalog_changed(*book_ids)
+        logger.info(f"Bulk update: {len(book_ids)} books changed by admin {current_user['sub']}")
+        return BulkMutationResponse(affected_count=len(book_ids), book_ids=book_ids)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error in bulk update: {str(e)}")
+        raise HTTPException(status_code=500, detail="Bulk update failed")
+
+@app.post("/books/bulk/delete", response_model=BulkMutationResponse)
+def delete_books_bulk(
+    selection: BookSelection,
+    current_user: dict = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Soft delete every selected book in one UPDATE (Admin only)"""
+    conditions = selection_filters(selection)
+    try:
+        book_ids = db.scalars(
+            update(Book).where(*conditions)
+            .values(is_available=False, updated_at=datetime.utcnow())
+            .returning(Book.id),
+            execution_options={"synchronize_session": False}
+        ).all()
+        search_index.remove_books(db, book_ids)
+        db.commit()
+        
+        for book_id in book_ids:
+            autocomplete_index.remove(book_id)
+        if book_ids:
+            catalog_changed(*book_ids)
+        logger.info(f"Bulk delete: {len(book_ids)} books deleted by admin {current_user['sub']}")
+        return BulkMutationResponse(affected_count=len(book_ids), book_ids=book_ids)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error in bulk delete: {str(e)}")
+        raise HTTPException(status_code=500, detail="Bulk delete failed")
+
 @app.put("/books/{book_id}", response_model=BookResponse)
 def update_book(
     book_id: int,
@@ -272,8 +1085,14 @@ def update_book(
         for field, value in update_data.items():
             setattr(db_book, field, value)
         
+        db.flush()
+        search_index.index_book(db, db_book)
         db.commit()
         db.refresh(db_book)
+        refresh_autocomplete(db_book)
+        if "image_url" in update_data:
+            image_variants.schedule(db_book.image_url)
+        catalog_changed(book_id)
         logger.info(f"Book updated: {db_book.title} by admin {current_user['sub']}")
         return db_book
     except HTTPException:
@@ -283,6 +1102,63 @@ def update_book(
         logger.error(f"Error updating book {book_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Could not update book")
 
+@app.post("/books/{book_id}/cover", response_model=CoverUploadResponse)
+async def upload_book_cover(
+    book_id: int,
+    request: Request,
+    current_user: dict = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Upload a cover image and attach it to a book (Admin only).
+
+    The request body is the raw image (e.g. Content-Type: image/jpeg) and is
+    streamed straight into the image store, so an oversized upload is refused
+    from its Content-Length, or as soon as it passes MAX_COVER_BYTES, rather
+    than after being received in full. Covers are stored under their SHA-256
+    digest, so a cover shared by several editions is kept once on disk.
+    """
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > MAX_COVER_BYTES:
+        raise HTTPException(status_code=413, detail=f"Image is larger than {MAX_COVER_BYTES} bytes")
+    
+    db_book = await run_in_threadpool(db.query(Book).filter(Book.id == book_id).first)
+    if not db_book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    
+    writer = await run_in_threadpool(CoverWriter)
+    try:
+        async for chunk in request.stream():
+            await run_in_threadpool(writer.write, chunk)
+        filename, digest, size, created = await run_in_threadpool(writer.finish)
+    except CoverTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except CoverRejected as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error storing cover for book {book_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not store image")
+    finally:
+        await run_in_threadpool(writer.discard)
+    
+    def attach_cover():
+        db_book.image_url = filename
+        db.commit()
+        db.refresh(db_book)
+        refresh_autocomplete(db_book)
+    
+    try:
+        await run_in_threadpool(attach_cover)
+        image_variants.schedule(filename)
+        catalog_changed(book_id)
+        logger.info(f"Cover {filename} attached to book {book_id} by admin {current_user['sub']}")
+        return CoverUploadResponse(
+            book_id=book_id, image_url=filename, sha256=digest, size=size, deduplicated=not created
+        )
+    except Exception as e:
+        await run_in_threadpool(db.rollback)
+        logger.error(f"Error attaching cover to book {book_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not attach image")
+
 @app.delete("/books/{book_id}")
 def delete_book(
     book_id: int,
@@ -296,7 +1172,10 @@ def delete_book(
             raise HTTPException(status_code=404, detail="Book not found")
         
         db_book.is_available = False
+        search_index.remove_book(db, book_id)
         db.commit()
+        autocomplete_index.remove(book_id)
+        catalog_changed(book_id)
         logger.info(f"Book deleted: {db_book.title} by admin {current_user['sub']}")
         return {"message": "Book deleted successfully", "book_id": book_id}
     except HTTPException:
@@ -306,40 +1185,61 @@ def delete_book(
         logger.error(f"Error deleting book {book_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Could not delete book")
 
+@app.get("/images/variants/{name}")
+async def get_image_variant(name: str, request: Request):
+    """Serve a resized cover variant, rendering it on first request"""
+    try:
+        found = await image_variants.variant_file(name)
+    except Exception as e:
+        logger.error(f"Error rendering image variant {name}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Could not render image")
+    if found is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    path, source = found
+    cache_control = await run_in_threadpool(static_assets.cache_control, source, request.url.query.encode())
+    return FileResponse(path, headers={"Cache-Control": cache_control})
+
 @app.get("/categories")
-def get_categories(db: Session = Depends(get_db)):
+async def get_categories(request: Request, db=Depends(get_read_db)):
     """Get all book categories with counts"""
+    cache_key = response_cache_key("/categories")
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        if etag_matches(request, cached.etag):
+            return not_modified(cached.etag)
+        return json_response(cached, request)
+    version = get_catalog_version()
+    
     try:
-        categories = db.query(
-            Book.category, 
-            func.count(Book.id).label('count')
-        ).filter(
-            Book.is_available == True
-        ).group_by(Book.category).all()
-        
-        return [{"name": cat[0], "count": cat[1]} for cat in categories if cat[0]]
+        result = await run_db(db, query_categories)
     except Exception as e:
         logger.error(f"Error fetching categories: {str(e)}")
         raise HTTPException(status_code=500, detail="Could not fetch categories")
+    body = render_json(result)
+    etag = content_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    cached = response_cache.set(cache_key, body, ("categories",), version, etag)
+    return json_response(cached, request)
 
 # ==================== USER ENDPOINTS ====================
 
 @app.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: Session = Depends(get_db)):
     """Register new user"""
     try:
         # Check if user exists
-        existing_user = db.query(User).filter(
+        existing_user = await run_in_threadpool(db.query(User).filter(
             (User.username == user.username) | (User.email == user.email)
-        ).first()
+        ).first)
         if existing_user:
             if existing_user.username == user.username:
                 raise HTTPException(status_code=400, detail="Username already registered")
             else:
                 raise HTTPException(status_code=400, detail="Email already registered")
         
-        # Create new user
-        hashed_password = hash_password(user.password)
+        # Create new user (bcrypt runs in the hashing pool, not the request threadpool)
+        hashed_password = await hash_password_async(user.password)
         db_user = User(
             username=user.username, 
             email=user.email, 
@@ -347,37 +1247,50 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
             is_admin=False
         )
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        await run_in_threadpool(db.commit)
+        await run_in_threadpool(db.refresh, db_user)
         
         logger.info(f"New user registered: {db_user.username}")
         return db_user
     except HTTPException:
         raise
+    except PasswordPoolBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
     except Exception as e:
-        db.rollback()
+        await run_in_threadpool(db.rollback)
         logger.error(f"Error registering user: {str(e)}")
         raise HTTPException(status_code=500, detail="Could not register user")
 
 @app.post("/login", response_model=Token)
-def login(user_login: UserLogin, db: Session = Depends(get_db)):
+async def login(user_login: UserLogin, db: Session = Depends(get_db)):
     """User login"""
     try:
-        user = db.query(User).filter(User.username == user_login.username).first()
-        if not user or not verify_password(user_login.password, user.hashed_password):
+        user = await run_in_threadpool(db.query(User).filter(User.username == user_login.username).first)
+        if not user or not await verify_password_async(user_login.password, user.hashed_password):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, 
                 detail="Invalid username or password",
                 headers={"WWW-Authenticate": "Bearer"}
             )
         
+        # Upgrade hashes made with an old cost factor while we have the plaintext
+        if needs_rehash(user.hashed_password):
+            try:
+                user.hashed_password = await password_pool.hash_password(user_login.password)
+                await run_in_threadpool(db.commit)
+            except Exception as e:
+                await run_in_threadpool(db.rollback)
+                logger.warning(f"Password rehash failed for {user.username}: {str(e)}")
+        
         access_token = create_access_token(
-            data={"sub": user.username, "is_admin": user.is_admin}
+            data={"sub": user.username, "uid": user.id, "is_admin": user.is_admin}
         )
         logger.info(f"User logged in: {user.username}")
         return {"access_token": access_token, "token_type": "bearer"}
     except HTTPException:
         raise
+    except PasswordPoolBusy:
+        raise HTTPException(status_code=503, detail="Server busy, please retry")
     except Exception as e:
         logger.error(f"Error during login: {str(e)}")
         raise HTTPException(status_code=500, detail="Login failed")
@@ -389,8 +1302,7 @@ def get_current_user_info(
 ):
     """Get current user information"""
     try:
-        username = current_user["sub"]
-        user = db.query(User).filter(User.username == username).first()
+        user = db.get(User, current_user["uid"])
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         return user
@@ -411,9 +1323,7 @@ def add_to_cart(
     """Add item to cart"""
     try:
         username = current_user["sub"]
-        user = db.query(User).filter(User.username == username).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+        user_id = current_user["uid"]
         
         # Check if book exists and is available
         book = db.query(Book).filter(
@@ -432,7 +1342,7 @@ def add_to_cart(
         
         # Check if item already in cart
         existing_item = db.query(CartItem).filter(
-            CartItem.user_id == user.id, 
+            CartItem.user_id == user_id, 
             CartItem.book_id == cart_item.book_id
         ).first()
         
@@ -446,7 +1356,7 @@ def add_to_cart(
             existing_item.quantity = new_quantity
         else:
             new_item = CartItem(
-                user_id=user.id, 
+                user_id=user_id, 
                 book_id=cart_item.book_id, 
                 quantity=cart_item.quantity
             )
@@ -470,45 +1380,40 @@ def get_cart(
     """Get user's cart"""
     try:
         username = current_user["sub"]
-        user = db.query(User).filter(User.username == username).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+        user_id = current_user["uid"]
         
-        cart_items = db.query(CartItem).filter(CartItem.user_id == user.id).all()
-        
-        items = []
-        total_price = 0.0
-        total_items = 0
-        
-        for item in cart_items:
-            book = db.query(Book).filter(Book.id == item.book_id).first()
-            if book and book.is_available:
-                cart_item_response = CartItemResponse(
-                    id=item.id,
-                    book={
-                        "id": book.id,
-                        "title": book.title,
-                        "author": book.author,
-                        "description": book.description,
-                        "category": book.category,
-                        "price": book.price,
-                        "image_url": get_image_url(book.image_url),
-                        "stock_quantity": book.stock_quantity,
-                        "is_available": book.is_available,
-                        "created_at": book.created_at
-                    },
-                    quantity=item.quantity,
-                    created_at=item.created_at
+        # Items, their books and the cart totals in a single round trip
+        rows = db.execute(
+            select_books(
+                CartItem.user_id == user_id,
+                Book.is_available == True,
+                columns=BOOK_COLUMNS + (
+                    CartItem.id.label("item_id"),
+                    CartItem.quantity,
+                    CartItem.created_at.label("added_at"),
+                    func.sum(CartItem.quantity).over().label("total_items"),
+                    func.sum(CartItem.quantity * Book.price).over().label("total_price")
                 )
-                items.append(cart_item_response)
-                total_price += book.price * item.quantity
-                total_items += item.quantity
-        
-        return CartSummary(
-            items=items,
-            total_items=total_items,
-            total_price=round(total_price, 2)
-        )
+            ).select_from(CartItem).join(Book, CartItem.book_id == Book.id).order_by(CartItem.id)
+        ).all()
+        
+        total_items = rows[0].total_items if rows else 0
+        total_price = rows[0].total_price if rows else 0.0
+        
+        # Shaped like CartSummary
+        return serialization.DefaultResponse({
+            "items": [
+                {
+                    "id": row.item_id,
+                    "book": book_payload(row),
+                    "quantity": row.quantity,
+                    "created_at": row.added_at
+                }
+                for row in rows
+            ],
+            "total_items": total_items,
+            "total_price": round(total_price, 2)
+        })
     except HTTPException:
         raise
     except Exception as e:
@@ -525,11 +1430,11 @@ def update_cart_item(
     """Update cart item quantity"""
     try:
         username = current_user["sub"]
-        user = db.query(User).filter(User.username == username).first()
+        user_id = current_user["uid"]
         
         cart_item = db.query(CartItem).filter(
             CartItem.id == cart_item_id,
-            CartItem.user_id == user.id
+            CartItem.user_id == user_id
         ).first()
         
         if not cart_item:
@@ -567,11 +1472,11 @@ def remove_from_cart(
     """Remove item from cart"""
     try:
         username = current_user["sub"]
-        user = db.query(User).filter(User.username == username).first()
+        user_id = current_user["uid"]
         
         cart_item = db.query(CartItem).filter(
             CartItem.id == cart_item_id, 
-            CartItem.user_id == user.id
+            CartItem.user_id == user_id
         ).first()
         
         if not cart_item:
@@ -597,9 +1502,9 @@ def clear_cart(
     """Clear user's entire cart"""
     try:
         username = current_user["sub"]
-        user = db.query(User).filter(User.username == username).first()
+        user_id = current_user["uid"]
         
-        deleted_count = db.query(CartItem).filter(CartItem.user_id == user.id).delete()
+        deleted_count = db.query(CartItem).filter(CartItem.user_id == user_id).delete()
         db.commit()
         
         logger.info(f"Cleared {deleted_count} items from cart for user {username}")
@@ -628,6 +1533,7 @@ def make_admin(
         
         user.is_admin = True
         db.commit()
+        invalidate_principal(username)
         
         logger.info(f"User {username} made admin by {current_user['sub']}")
         return {"message": f"{username} is now an admin"}
@@ -664,15 +1570,19 @@ def get_admin_stats(
         total_users = db.query(func.count(User.id)).scalar()
         total_categories = db.query(func.count(func.distinct(Book.category))).filter(Book.is_available == True).scalar()
         
-        # Low stock books (less than 10 in stock)
-        low_stock_books = db.query(Book).filter(
-            Book.is_available == True,
-            Book.stock_quantity < 10
-        ).limit(10).all()
+        # Low stock books (less than LOW_STOCK_THRESHOLD in stock)
+        low_stock_books = db.execute(select_books(
+            low_stock,
+            columns=(Book.id, Book.title, Book.stock_quantity)
+        ).limit(10)).all()
         
         # Recent activities
-        recent_users = db.query(User).order_by(User.created_at.desc()).limit(5).all()
-        recent_books = db.query(Book).order_by(Book.created_at.desc()).limit(5).all()
+        recent_users = db.execute(
+            select(User.username, User.created_at).order_by(User.created_at.desc()).limit(5)
+        ).all()
+        recent_books = db.execute(
+            select_books(columns=(Book.title, Book.author, Book.created_at)).order_by(Book.created_at.desc()).limit(5)
+        ).all()
         
         return {
             "total_books": total_books,
@@ -695,6 +1605,23 @@ def get_admin_stats(
         logger.error(f"Error fetching admin stats: {str(e)}")
         raise HTTPException(status_code=500, detail="Could not fetch statistics")
 
+@app.get("/admin/auth/stats")
+def get_auth_stats(current_user: dict = Depends(get_current_admin_user)):
+    """Get password hashing pool and token cache statistics (Admin only)"""
+    return {
+        "password_pool": password_pool.stats(),
+        "token_cache": token_cache_stats()
+    }
+
+@app.get("/admin/cache/stats")
+def get_cache_stats(current_user: dict = Depends(get_current_admin_user)):
+    """Get response cache hit/miss/eviction counters (Admin only)"""
+    return {
+        "response_cache": response_cache.stats(),
+        "count_cache": count_cache.stats(),
+        "catalog_version": get_catalog_version()
+    }
+
 # ==================== SEED & SEARCH ENDPOINTS ====================
 
 @app.post("/seed")
@@ -740,42 +1667,39 @@ def seed_data(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail="Could not seed data")
 
 @app.get("/search")
-def search_books(
+async def search_books(
+    request: Request,
     q: str = Query(..., min_length=2, description="Search query"),
     limit: int = Query(10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="Comma-separated book fields to return"),
+    db=Depends(get_read_db)
 ):
     """Quick search endpoint for autocomplete"""
+    fields = parse_fields(fields)
+    await reconcile_autocomplete(db)
+    cache_key = response_cache_key("/search", q=q, limit=limit, fields=fields)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return json_response(cached, request)
+    version = get_catalog_version()
+    
     try:
-        search_term = f"%{q}%"
-        books = db.query(Book).filter(
-            Book.is_available == True,
-            (Book.title.ilike(search_term)) | 
-            (Book.author.ilike(search_term))
-        ).limit(limit).all()
-        
-        return {
-            "query": q,
-            "results": [
-                {
-                    "id": book.id,
-                    "title": book.title,
-                    "author": book.author,
-                    "description": book.description,
-                    "category": book.category,
-                    "price": book.price,
-                    "image_url": get_image_url(book.image_url),
-                    "stock_quantity": book.stock_quantity,
-                    "is_available": book.is_available,
-                    "created_at": book.created_at.isoformat() if book.created_at else None
-                }
-                for book in books
-            ],
-            "count": len(books)
-        }
+        if autocomplete_index.ready:
+            results = [book_payload(entry, fields or DEFAULT_BOOK_FIELDS) for entry in autocomplete_index.search(q, limit)]
+        else:
+            # Fall back to the full-text index if the in-memory index failed to build
+            results = await run_db(db, query_search_results, q, limit, fields)
     except Exception as e:
         logger.error(f"Error searching books: {str(e)}")
         raise HTTPException(status_code=500, detail="Search failed")
+    
+    result = {
+        "query": q,
+        "results": results,
+        "count": len(results)
+    }
+    cached = response_cache.set(cache_key, render_json(result), ("search",), version)
+    return json_response(cached, request)
 
 # ==================== ERROR HANDLERS ====================
 
@@ -0,0 +1,200 @@
+"""
+Request metrics in the Prometheus text exposition format (served at /metrics).
+
+Counters live in this process only; with several workers each one reports
+its own series, so scrape them individually (or aggregate by instance).
+"""
+
+from bisect import bisect_left
+import time
+
+import anyio.to_thread
+from starlette.routing import Mount
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Prometheus client defaults, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+UNMATCHED_ROUTE = "<unmatched>"
+
+class Histogram:
+    """Cumulative-bucket latency histogram"""
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect_left(LATENCY_BUCKETS, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            running += count
+            yield bound, running
+
+# Only touched from the event loop thread, so no locking
+requests_total = {}  # (method, route, status) -> count
+request_latency = {}  # (method, route) -> Histogram
+in_flight = 0
+
+def route_label(scope) -> str:
+    """Route template (/books/{book_id}) rather than the raw path, to bound label cardinality"""
+    route = scope.get("route")  # set by FastAPI's APIRoute
+    if route is not None:
+        return route.path
+    # Plain Starlette routes (docs, mounts) only leave their endpoint behind
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is not None and app is not None:
+        for candidate in app.routes:
+            if getattr(candidate, "endpoint", None) is endpoint:
+                return candidate.path
+            if isinstance(candidate, Mount) and candidate.app is endpoint:
+                return candidate.path + "/*"
+    return UNMATCHED_ROUTE
+
+# ==================== MIDDLEWARE ====================
+
+class MetricsMiddleware:
+    """Per-route request counts, latency histograms and the in-flight gauge.
+
+    Latency runs until the last body chunk is sent, so streamed responses
+    (export, import progress) are measured in full.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global in_flight
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight -= 1
+            route = route_label(scope)
+            key = (scope["method"], route, str(status_code))
+            requests_total[key] = requests_total.get(key, 0) + 1
+            histogram = request_latency.get(key[:2])
+            if histogram is None:
+                histogram = request_latency[key[:2]] = Histogram()
+            histogram.observe(time.perf_counter() - started)
+
+# ==================== EXPOSITION ====================
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+class Exposition:
+    """Builder for the text format: one HELP/TYPE header per metric family"""
+
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name: str, kind: str, help_text: str):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value, **labels):
+        self.lines.append(f"{name}{_labels(**labels)} {value}")
+
+    def render(self) -> bytes:
+        return ("\n".join(self.lines) + "\n").encode("utf-8")
+
+def pool_stats(engine) -> dict:
+    """Connection pool counters; pools without them (SQLite's StaticPool) report nothing"""
+    pool = engine.pool
+    stats = {}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    return stats
+
+def render(engines: dict, caches: dict, extra=None) -> bytes:
+    """Exposition for all metrics. Must run on the event loop (reads the threadpool limiter).
+
+    `engines` maps a label to a SQLAlchemy Engine, `caches` a label to a
+    stats() dict with hits/misses (and optionally entries), and `extra` is
+    an optional callable that adds app-specific families to the builder.
+    """
+    out = Exposition()
+
+    out.family("http_requests_total", "counter", "HTTP requests by route template and status code")
+    for (method, route, status_code), count in sorted(requests_total.items()):
+        out.sample("http_requests_total", count, method=method, route=route, status=status_code)
+
+    out.family("http_request_duration_seconds", "histogram", "HTTP request latency by route template")
+    for (method, route), histogram in sorted(request_latency.items()):
+        for bound, count in histogram.cumulative():
+            out.sample("http_request_duration_seconds_bucket", count, method=method, route=route, le=f"{bound:g}")
+        out.sample("http_request_duration_seconds_bucket", histogram.count, method=method, route=route, le="+Inf")
+        out.sample("http_request_duration_seconds_sum", histogram.total, method=method, route=route)
+        out.sample("http_request_duration_seconds_count", histogram.count, method=method, route=route)
+
+    out.family("http_requests_in_flight", "gauge", "HTTP requests currently being served")
+    out.sample("http_requests_in_flight", in_flight)
+
+    pools = {label: pool_stats(engine) for label, engine in engines.items()}
+    for name, help_text in (
+        ("size", "Configured pool size"),
+        ("checkedout", "Connections currently checked out"),
+        ("checkedin", "Idle connections in the pool"),
+        ("overflow", "Connections open beyond the pool size (negative while below it)"),
+    ):
+        samples = [(label, stats[name]) for label, stats in pools.items() if name in stats]
+        if samples:
+            out.family(f"db_pool_{name}", "gauge", help_text)
+            for label, value in samples:
+                out.sample(f"db_pool_{name}", value, engine=label)
+
+    limiter = anyio.to_thread.current_default_thread_limiter().statistics()
+    out.family("threadpool_max_threads", "gauge", "Worker threads available to sync endpoints")
+    out.sample("threadpool_max_threads", int(limiter.total_tokens))
+    out.family("threadpool_busy_threads", "gauge", "Worker threads currently running sync code")
+    out.sample("threadpool_busy_threads", limiter.borrowed_tokens)
+    out.family("threadpool_queue_depth", "gauge", "Calls waiting for a free worker thread")
+    out.sample("threadpool_queue_depth", limiter.tasks_waiting)
+
+    out.family("cache_hits_total", "counter", "Cache lookups that found an entry")
+    for label, stats in caches.items():
+        out.sample("cache_hits_total", stats["hits"], cache=label)
+    out.family("cache_misses_total", "counter", "Cache lookups that missed")
+    for label, stats in caches.items():
+        out.sample("cache_misses_total", stats["misses"], cache=label)
+    out.family("cache_hit_ratio", "gauge", "Hits over lookups since start")
+    for label, stats in caches.items():
+        out.sample("cache_hit_ratio", float(stats["hit_ratio"]), cache=label)
+    out.family("cache_entries", "gauge", "Entries currently held")
+    for label, stats in caches.items():
+        if "entries" in stats:
+            out.sample("cache_entries", stats["entries"], cache=label)
+
+    if extra is not None:
+        extra(out)
+    return out.render()
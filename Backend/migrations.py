@@ -0,0 +1,152 @@
+"""
+Versioned schema migrations, applied in order at startup (or ahead of a
+deploy with `python migrations.py`).
+
+Missing tables are created from the models first, so a fresh database
+already has the current schema; each migration must therefore be
+idempotent. Applied versions are recorded in the schema_migrations table.
+"""
+
+from datetime import datetime
+import logging
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.schema import CreateIndex
+
+from database import Base, engine
+from models import CATALOG_INDEXES, backfill_summaries
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key for the PostgreSQL advisory lock that serializes concurrent workers
+MIGRATION_LOCK_ID = 72_410_023
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+MIGRATIONS = []  # (version, name, fn, transactional), in version order
+
+def migration(version: int, name: str, transactional: bool = True):
+    """Register `fn(connection)` as a migration.
+
+    Non-transactional migrations run on an autocommit connection, which
+    PostgreSQL requires for CREATE INDEX CONCURRENTLY.
+    """
+    def register(fn):
+        if MIGRATIONS and MIGRATIONS[-1][0] >= version:
+            raise ValueError(f"Migration {version} ({name}) registered out of order")
+        MIGRATIONS.append((version, name, fn, transactional))
+        return fn
+    return register
+
+# ==================== HELPERS ====================
+
+def add_missing_columns(connection):
+    """Add nullable columns that were introduced after a table was first created"""
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+            logger.info(f"Added column {table.name}.{column.name}")
+
+def create_index_online(connection, index):
+    """Create an index if missing, without blocking writes where the database allows it"""
+    if connection.dialect.name != "postgresql":
+        index.create(connection, checkfirst=True)
+        return
+
+    # A failed CONCURRENTLY build leaves an invalid index behind that IF NOT EXISTS would keep
+    invalid = connection.execute(text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": index.name}).first()
+    if invalid:
+        connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+
+    ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=connection.dialect))
+    connection.execute(text(ddl.replace("CREATE INDEX", "CREATE INDEX CONCURRENTLY", 1)))
+
+# ==================== MIGRATIONS ====================
+
+@migration(1, "add_missing_columns")
+def _add_missing_columns(connection):
+    add_missing_columns(connection)
+
+@migration(2, "backfill_book_summaries")
+def _backfill_book_summaries(connection):
+    backfilled = backfill_summaries(connection)
+    if backfilled:
+        logger.info(f"Backfilled summaries for {backfilled} books")
+
+@migration(3, "catalog_indexes", transactional=False)
+def _catalog_indexes(connection):
+    for index in CATALOG_INDEXES:
+        create_index_online(connection, index)
+    # Refresh planner statistics so the new indexes are picked up straight away
+    connection.execute(text("ANALYZE books"))
+
+# ==================== RUNNER ====================
+
+def applied_versions(connection) -> set:
+    return set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+def pending_migrations(connection) -> list:
+    applied = applied_versions(connection)
+    return [entry for entry in MIGRATIONS if entry[0] not in applied]
+
+def apply_migration(version: int, name: str, fn, transactional: bool):
+    logger.info(f"Applying migration {version} ({name})")
+    if transactional:
+        with engine.begin() as connection:
+            fn(connection)
+            connection.execute(schema_migrations.insert().values(
+                version=version, name=name, applied_at=datetime.utcnow()
+            ))
+        return
+
+    with engine.connect() as connection:
+        fn(connection.execution_options(isolation_level="AUTOCOMMIT"))
+    with engine.begin() as connection:
+        connection.execute(schema_migrations.insert().values(
+            version=version, name=name, applied_at=datetime.utcnow()
+        ))
+
+def run_migrations() -> list:
+    """Create missing tables and apply pending migrations; returns the versions applied"""
+    lock = None
+    if engine.dialect.name == "postgresql":
+        # Session-level lock held on its own connection while the migrations run on others
+        lock = engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+        lock.execute(text("SELECT pg_advisory_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+    try:
+        with engine.begin() as connection:
+            schema_migrations.create(connection, checkfirst=True)
+            Base.metadata.create_all(connection)
+            pending = pending_migrations(connection)
+
+        for entry in pending:
+            apply_migration(*entry)
+        return [entry[0] for entry in pending]
+    finally:
+        if lock is not None:
+            lock.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MIGRATION_LOCK_ID})
+            lock.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    applied = run_migrations()
+    if applied:
+        print(f"✅ Applied migrations: {', '.join(str(version) for version in applied)}")
+    else:
+        print("✅ Database schema is up to date")
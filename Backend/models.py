@@ -1,7 +1,25 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Boolean, Index, select, update, bindparam, literal
+from sqlalchemy.orm import relationship, validates
 from database import Base
 from datetime import datetime
+from typing import Optional
+
+SUMMARY_LENGTH = 160
+LOW_STOCK_THRESHOLD = 10
+
+def summarize(description: Optional[str], length: int = SUMMARY_LENGTH) -> Optional[str]:
+    """Card-sized excerpt of a description, cut at a word boundary"""
+    if not description:
+        return description
+    text = " ".join(description.split())
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(" ", 1)[0] or text[:length]
+    return cut.rstrip(" ,;:।") + "…"
+
+def _default_summary(context):
+    # Core/bulk INSERTs that don't pass a summary
+    return summarize(context.get_current_parameters().get("description"))
 
 class User(Base):
     __tablename__ = "users"
@@ -23,15 +41,43 @@ class Book(Base):
     title = Column(String(200), index=True, nullable=False)
     author = Column(String(100), nullable=False)
     description = Column(Text)
+    summary = Column(String(SUMMARY_LENGTH + 1), default=_default_summary)
     category = Column(String(50), index=True, nullable=False)
     price = Column(Float, nullable=False)
     image_url = Column(String(255))
     stock_quantity = Column(Integer, default=0)
     is_available = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     cart_items = relationship("CartItem", back_populates="book", cascade="all, delete-orphan")
+    
+    @validates("description")
+    def _sync_summary(self, key, description):
+        self.summary = summarize(description)
+        return description
+
+# Composite indexes for the catalog's query shapes: available books (optionally in one
+# category) ordered by a listing sort column, with id as the keyset tie-breaker.
+# Added to existing databases by migrations.py.
+CATALOG_INDEXES = (
+    Index("ix_books_available_created", Book.is_available, Book.created_at, Book.id),
+    Index("ix_books_available_category_created", Book.is_available, Book.category, Book.created_at, Book.id),
+    Index("ix_books_available_price", Book.is_available, Book.price, Book.id),
+    Index("ix_books_available_author", Book.is_available, Book.author, Book.id),
+    # Partial where supported: only the handful of low-stock rows are indexed
+    Index(
+        "ix_books_low_stock", Book.is_available, Book.stock_quantity,
+        sqlite_where=(Book.is_available == True) & (Book.stock_quantity < LOW_STOCK_THRESHOLD),
+        postgresql_where=(Book.is_available == True) & (Book.stock_quantity < LOW_STOCK_THRESHOLD)
+    ),
+)
+
+# Rendered inline rather than bound, so the planner can match ix_books_low_stock's WHERE
+low_stock = (Book.is_available == True) & (
+    Book.stock_quantity < literal(LOW_STOCK_THRESHOLD, literal_execute=True)
+)
 
 class CartItem(Base):
     __tablename__ = "cart_items"
@@ -44,4 +90,25 @@ class CartItem(Base):
     
     # Relationships
     user = relationship("User", back_populates="cart_items")
-    book = relationship("Book", back_populates="cart_items")
\ No newline at end of file
+    book = relationship("Book", back_populates="cart_items")
+
+def backfill_summaries(connection, batch_size: int = 1000) -> int:
+    """Fill Book.summary for rows written before the column existed; returns rows updated"""
+    table = Book.__table__
+    statement = update(table).where(table.c.id == bindparam("book_id")).values(summary=bindparam("new_summary"))
+    updated = 0
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(table.c.id, table.c.description)
+            .where(table.c.summary.is_(None), table.c.description.isnot(None), table.c.id > last_id)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return updated
+        connection.execute(statement, [
+            {"book_id": row.id, "new_summary": summarize(row.description)} for row in rows
+        ])
+        updated += len(rows)
+        last_id = rows[-1].id
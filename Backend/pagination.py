@@ -0,0 +1,37 @@
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from datetime import datetime
+import base64
+import json
+
+SORT_COLUMNS = ("title", "author", "price", "created_at")
+
+def encode_cursor(sort_by: str, sort_order: str, value, row_id: int, direction: str) -> str:
+    """Encode a keyset position (sort value, id) into an opaque URL-safe token"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = {"s": sort_by, "o": sort_order, "v": value, "id": row_id, "d": direction}
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> dict:
+    """Decode a cursor produced by encode_cursor for the same sort"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if payload["d"] not in ("next", "prev") or not isinstance(payload["id"], int):
+            raise ValueError("bad cursor direction or id")
+        if sort_by == "created_at" and payload["v"] is not None:
+            payload["v"] = datetime.fromisoformat(payload["v"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if payload["s"] != sort_by or payload["o"] != sort_order:
+        raise HTTPException(status_code=400, detail="Cursor does not match the requested sort")
+    return payload
+
+def keyset_condition(sort_column, id_column, value, row_id: int, descending: bool):
+    """Rows strictly after (value, row_id) in (sort_column, id_column) order"""
+    if descending:
+        return or_(sort_column < value, and_(sort_column == value, id_column < row_id))
+    return or_(sort_column > value, and_(sort_column == value, id_column > row_id))
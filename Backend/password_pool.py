@@ -0,0 +1,93 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+import bcrypt
+import os
+import threading
+import time
+
+# Kept free of app imports so spawned worker processes start quickly
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_POOL_SIZE = int(os.getenv("BCRYPT_POOL_SIZE", str(max(1, (os.cpu_count() or 2) // 2))))
+BCRYPT_MAX_QUEUE = int(os.getenv("BCRYPT_MAX_QUEUE", "64"))
+
+class PasswordPoolBusy(Exception):
+    """Raised when too many hash/verify jobs are already queued"""
+
+def _hash(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+def _check(password: bytes, hashed: bytes) -> bool:
+    try:
+        return bcrypt.checkpw(password, hashed)
+    except Exception:
+        return False
+
+_executor = None
+_executor_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_in_flight = 0
+_completed = 0
+_rejected = 0
+_total_seconds = 0.0
+_max_seconds = 0.0
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if BCRYPT_POOL_SIZE > 0:
+                _executor = ProcessPoolExecutor(max_workers=BCRYPT_POOL_SIZE)
+            else:
+                # bcrypt releases the GIL, so a private thread pool still keeps it off the shared one
+                _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="bcrypt")
+        return _executor
+
+async def _submit(fn, *args):
+    global _in_flight, _completed, _rejected, _total_seconds, _max_seconds
+    with _stats_lock:
+        if _in_flight >= BCRYPT_MAX_QUEUE:
+            _rejected += 1
+            raise PasswordPoolBusy()
+        _in_flight += 1
+
+    start = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+    finally:
+        elapsed = time.perf_counter() - start
+        with _stats_lock:
+            _in_flight -= 1
+            _completed += 1
+            _total_seconds += elapsed
+            _max_seconds = max(_max_seconds, elapsed)
+
+async def hash_password(password: str) -> str:
+    """bcrypt-hash a password in the pool at BCRYPT_ROUNDS"""
+    hashed = await _submit(_hash, password.encode("utf-8"), BCRYPT_ROUNDS)
+    return hashed.decode("utf-8")
+
+async def check_password(password: str, hashed_password: str) -> bool:
+    """Check a password against a bcrypt hash in the pool"""
+    return await _submit(_check, password.encode("utf-8"), hashed_password.encode("utf-8"))
+
+def hash_rounds(hashed_password: str):
+    """Cost factor encoded in a bcrypt hash ($2b$<rounds>$...), or None if unparseable"""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+def stats() -> dict:
+    """Queue depth and latency counters"""
+    with _stats_lock:
+        return {
+            "pool": "process" if BCRYPT_POOL_SIZE > 0 else "thread",
+            "workers": BCRYPT_POOL_SIZE or 2,
+            "rounds": BCRYPT_ROUNDS,
+            "max_queue": BCRYPT_MAX_QUEUE,
+            "in_flight": _in_flight,
+            "completed": _completed,
+            "rejected": _rejected,
+            "avg_latency_ms": round(_total_seconds / _completed * 1000, 2) if _completed else 0.0,
+            "max_latency_ms": round(_max_seconds * 1000, 2),
+        }
@@ -0,0 +1,165 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+QUERY_STATS_HEADERS = os.getenv("QUERY_STATS_HEADERS", "true").lower() in ("1", "true", "yes")
+# The same statement this many times in one request is reported as a probable N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+STATEMENT_LOG_LENGTH = 200
+
+class QueryStats:
+    """SQL statements executed on behalf of one request (or one query_budget block)"""
+
+    __slots__ = ("label", "count", "duration", "statements", "_lock")
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.duration = 0.0
+        self.statements = Counter()
+        # Sync endpoints and their dependencies run on threadpool workers
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float):
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.statements[statement] += 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list:
+        """(statement, times) for statements run at least `threshold` times"""
+        return [(statement, times) for statement, times in self.statements.most_common() if times >= threshold]
+
+    def summary(self) -> str:
+        return f"{self.count} queries in {self.duration * 1000:.1f} ms"
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_budgets = []  # QueryStats of finished requests go to every active query_budget
+_budgets_lock = threading.Lock()
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+# ==================== ENGINE HOOKS ====================
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    started = conn.info.get("query_start_time")
+    if not started:
+        return
+    stats.record(statement, time.perf_counter() - started.pop())
+
+def instrument(engine):
+    """Count statements run on `engine` (sync Engine, or an AsyncEngine's sync_engine)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+def report(stats: QueryStats, status_code: Optional[int] = None):
+    """Log a finished request's totals and any probable N+1 statements"""
+    logger.debug(
+        f"{stats.label} -> {status_code}: {stats.summary()}",
+        extra={"db_queries": stats.count, "db_time_ms": round(stats.duration * 1000, 2)}
+    )
+    for statement, times in stats.repeated():
+        logger.warning(
+            f"Probable N+1 in {stats.label}: statement ran {times} times: "
+            f"{' '.join(statement.split())[:STATEMENT_LOG_LENGTH]}",
+            extra={"db_queries": stats.count, "db_repeated": times}
+        )
+    with _budgets_lock:
+        for budget in _budgets:
+            budget.append(stats)
+
+# ==================== MIDDLEWARE ====================
+
+class QueryStatsMiddleware:
+    """Track SQL per request: X-DB-Queries / Server-Timing headers, log fields and N+1 warnings.
+
+    Streamed bodies (export, import progress) keep querying after the headers
+    go out; their headers cover only the work done before the first chunk,
+    while the log line covers the whole request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(f"{scope['method']} {scope['path']}")
+        token = _current.set(stats)
+        status_code = None
+
+        async def send_with_stats(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if QUERY_STATS_HEADERS:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Queries"] = str(stats.count)
+                    headers["X-DB-Time"] = f"{stats.duration * 1000:.2f}"
+                    headers.append("Server-Timing", f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"')
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            report(stats, status_code)
+
+# ==================== QUERY BUDGETS ====================
+
+@contextmanager
+def query_budget(max_queries: int, allow_repeats: bool = False):
+    """Fail if any request (or direct DB work) inside the block runs more than `max_queries`.
+
+    Also fails on probable N+1s unless `allow_repeats`. Meant for tests and
+    ad-hoc checks, e.g.:
+
+        with query_budget(2):
+            client.get("/cart", headers=auth_headers)
+    """
+    direct = QueryStats("query_budget block")
+    finished = []
+    token = _current.set(direct)
+    with _budgets_lock:
+        _budgets.append(finished)
+    try:
+        yield finished
+    finally:
+        _current.reset(token)
+        with _budgets_lock:
+            _budgets.remove(finished)
+
+    for stats in finished + ([direct] if direct.count else []):
+        if stats.count > max_queries:
+            raise AssertionError(
+                f"{stats.label} ran {stats.count} queries (budget {max_queries}): "
+                + "; ".join(f"{times}x {' '.join(statement.split())[:80]}" for statement, times in stats.statements.most_common(5))
+            )
+        repeated = stats.repeated()
+        if repeated and not allow_repeats:
+            statement, times = repeated[0]
+            raise AssertionError(
+                f"{stats.label} ran the same statement {times} times (probable N+1): "
+                f"{' '.join(statement.split())[:STATEMENT_LOG_LENGTH]}"
+            )
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 class BookCreate(BaseModel):
@@ -29,6 +29,7 @@ class BookResponse(BaseModel):
     category: str
     price: float
     image_url: str
+    image_srcset: Optional[Dict[str, str]] = None
     stock_quantity: int
     is_available: bool
     created_at: datetime
@@ -77,10 +78,12 @@ class CartUpdate(BaseModel):
 
 class PaginatedBooks(BaseModel):
     books: List[BookResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     per_page: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 class CartSummary(BaseModel):
     items: List[CartItemResponse]
@@ -90,8 +93,34 @@ class CartSummary(BaseModel):
 class BulkBookCreate(BaseModel):
     books: List[BookCreate]
 
+class BookSelection(BaseModel):
+    """Books to act on: explicit ids, or the same filters as GET /books"""
+    book_ids: Optional[List[int]] = None
+    category: Optional[str] = None
+    search: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+
+class BulkBookUpdate(BookSelection):
+    price: Optional[float] = None
+    price_change_percent: Optional[float] = None
+    stock_quantity: Optional[int] = None
+    stock_change: Optional[int] = None
+
+class BulkMutationResponse(BaseModel):
+    affected_count: int
+    book_ids: List[int]
+
+class CoverUploadResponse(BaseModel):
+    book_id: int
+    image_url: str
+    sha256: str
+    size: int
+    deduplicated: bool
+
 class BulkOperationResponse(BaseModel):
     success_count: int
     failed_count: int
     errors: List[str]
+    created_ids: List[int] = []
     
\ No newline at end of file
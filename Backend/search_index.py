@@ -0,0 +1,170 @@
+from sqlalchemy import bindparam, text, false
+from database import engine
+from models import Book
+import logging
+import re
+import unicodedata
+
+logger = logging.getLogger(__name__)
+
+NUKTA = "\u093c"
+CHANDRABINDU = "\u0901"
+ANUSVARA = "\u0902"
+
+# Word characters plus the Devanagari block (letters, matras, signs) minus the danda punctuation.
+# Python's \w treats matras as separators, which would split every Hindi word apart.
+TOKEN_PATTERN = re.compile(r"[\w\u0900-\u0963\u0966-\u097f]+")
+
+# Nukta is dropped (क़ -> क), chandrabindu folds to anusvara (हँसी -> हंसी),
+# and zero-width joiners/non-joiners are removed
+FOLD_TABLE = str.maketrans({
+    NUKTA: None,
+    CHANDRABINDU: ANUSVARA,
+    "\u200c": None,
+    "\u200d": None,
+})
+
+# FTS5's default unicode61 tokenizer only treats L*, N* and Co as token characters,
+# so Devanagari vowel signs (Mn/Mc) have to be added explicitly
+SQLITE_FTS_TABLE = "books_fts"
+SQLITE_TOKENIZER = "unicode61 categories 'L* N* Co M*'"
+
+POSTGRES_SEARCH_TABLE = "books_search"
+POSTGRES_WEIGHTS = {"title": "A", "author": "B", "description": "C"}
+
+SEARCH_COLUMNS = ("title", "author", "description")
+
+def normalize_text(value: str) -> str:
+    """Normalize text for indexing and querying (NFC, nukta/chandrabindu folding, casefold)"""
+    if not value:
+        return ""
+    return unicodedata.normalize("NFC", value).translate(FOLD_TABLE).casefold()
+
+def tokenize(value: str) -> list:
+    """Split normalized text into search tokens"""
+    return TOKEN_PATTERN.findall(normalize_text(value))
+
+def _is_postgres() -> bool:
+    return engine.dialect.name == "postgresql"
+
+def create_search_index():
+    """Create the full-text index structures and backfill them if empty"""
+    with engine.begin() as connection:
+        if _is_postgres():
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {POSTGRES_SEARCH_TABLE} ("
+                "book_id INTEGER PRIMARY KEY REFERENCES books(id) ON DELETE CASCADE, "
+                "document TSVECTOR NOT NULL)"
+            ))
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{POSTGRES_SEARCH_TABLE}_document "
+                f"ON {POSTGRES_SEARCH_TABLE} USING GIN (document)"
+            ))
+        else:
+            connection.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} "
+                f"USING fts5(title, author, description, tokenize=\"{SQLITE_TOKENIZER}\")"
+            ))
+
+        index_table = POSTGRES_SEARCH_TABLE if _is_postgres() else SQLITE_FTS_TABLE
+        indexed = connection.execute(text(f"SELECT COUNT(*) FROM {index_table}")).scalar()
+        if indexed:
+            return
+
+        available = connection.execute(
+            text("SELECT COUNT(*) FROM books WHERE is_available = :available"),
+            {"available": True}
+        ).scalar()
+        if available:
+            rebuild_search_index(connection)
+
+def rebuild_search_index(connection):
+    """Re-index every available book"""
+    rows = connection.execute(
+        text("SELECT id, title, author, description FROM books WHERE is_available = :available"),
+        {"available": True}
+    ).mappings().all()
+
+    index_table = POSTGRES_SEARCH_TABLE if _is_postgres() else SQLITE_FTS_TABLE
+    connection.execute(text(f"DELETE FROM {index_table}"))
+    if rows:
+        connection.execute(_insert_statement(), [_index_params(row) for row in rows])
+    logger.info(f"Search index rebuilt with {len(rows)} books")
+
+def _index_params(row) -> dict:
+    params = {"id": row["id"]}
+    for column in SEARCH_COLUMNS:
+        if _is_postgres():
+            params[column] = tokenize(row[column])
+        else:
+            params[column] = normalize_text(row[column])
+    return params
+
+def _insert_statement():
+    if _is_postgres():
+        document = " || ".join(
+            f"setweight(array_to_tsvector(CAST(:{column} AS text[])), '{weight}')"
+            for column, weight in POSTGRES_WEIGHTS.items()
+        )
+        return text(
+            f"INSERT INTO {POSTGRES_SEARCH_TABLE} (book_id, document) VALUES (:id, {document}) "
+            "ON CONFLICT (book_id) DO UPDATE SET document = EXCLUDED.document"
+        )
+    return text(
+        f"INSERT INTO {SQLITE_FTS_TABLE} (rowid, title, author, description) "
+        "VALUES (:id, :title, :author, :description)"
+    )
+
+def index_book(db, book):
+    """Add or refresh a book in the search index inside the caller's transaction"""
+    remove_book(db, book.id)
+    if not book.is_available:
+        return
+    row = {"id": book.id, "title": book.title, "author": book.author, "description": book.description}
+    db.execute(_insert_statement(), _index_params(row))
+
+def index_new_books(db, rows):
+    """Index freshly inserted available books (dicts with id/title/author/description) in one batch"""
+    params = [_index_params(row) for row in rows]
+    if params:
+        db.execute(_insert_statement(), params)
+
+def remove_book(db, book_id: int):
+    """Remove a book from the search index inside the caller's transaction"""
+    if _is_postgres():
+        db.execute(text(f"DELETE FROM {POSTGRES_SEARCH_TABLE} WHERE book_id = :id"), {"id": book_id})
+    else:
+        db.execute(text(f"DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid = :id"), {"id": book_id})
+
+def remove_books(db, book_ids):
+    """Remove several books from the search index inside the caller's transaction"""
+    if not book_ids:
+        return
+    if _is_postgres():
+        statement = text(f"DELETE FROM {POSTGRES_SEARCH_TABLE} WHERE book_id IN :ids")
+    else:
+        statement = text(f"DELETE FROM {SQLITE_FTS_TABLE} WHERE rowid IN :ids")
+    db.execute(statement.bindparams(bindparam("ids", expanding=True)), {"ids": list(book_ids)})
+
+def search_condition(query: str, columns=SEARCH_COLUMNS):
+    """Build a filter on Book.id matching every query token as a prefix in the given columns"""
+    tokens = tokenize(query)
+    if not tokens:
+        return false()
+
+    if _is_postgres():
+        weights = "".join(POSTGRES_WEIGHTS[column] for column in columns)
+        ts_query = " & ".join(f"'{token}':*{weights}" for token in tokens)
+        matches = text(
+            f"SELECT book_id FROM {POSTGRES_SEARCH_TABLE} "
+            "WHERE document @@ CAST(:search_query AS tsquery)"
+        ).bindparams(search_query=ts_query)
+    else:
+        match = " AND ".join(f'"{token}"*' for token in tokens)
+        if tuple(columns) != SEARCH_COLUMNS:
+            match = f"{{{' '.join(columns)}}} : ({match})"
+        matches = text(
+            f"SELECT rowid FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH :search_query"
+        ).bindparams(search_query=match)
+
+    return Book.id.in_(matches.columns(Book.id))
@@ -0,0 +1,30 @@
+from datetime import date, datetime
+import json
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+try:
+    import orjson
+except ImportError:  # falls back to the stdlib encoder
+    orjson = None
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return jsonable_encoder(value)
+
+def dumps(payload) -> bytes:
+    """Encode trusted, already-shaped data (dicts, lists, datetimes) straight to JSON bytes.
+
+    No validation pass: callers build the payload from DB rows they control.
+    Anything else (e.g. a pydantic model) goes through jsonable_encoder.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(
+        payload, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+# Used for every endpoint that returns plain data rather than a Response
+DefaultResponse = ORJSONResponse if orjson is not None else JSONResponse
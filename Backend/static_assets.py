@@ -0,0 +1,189 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import parse_qs
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import threading
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:  # .br siblings are then only served if built elsewhere
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+PRECOMPRESS_EXTENSIONS = (".svg", ".json", ".css", ".js", ".txt", ".xml")
+PRECOMPRESS_MIN_BYTES = 512
+# Encodings in preference order, with the sibling suffix that holds each
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Uploaded covers are named <sha256>.<ext> and never change
+CONTENT_ADDRESSED_PATTERN = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+
+# ==================== FINGERPRINTS ====================
+
+_fingerprints = {}  # path -> (mtime_ns, size, fingerprint)
+_hashing = set()  # paths queued for a background fingerprint
+_hashing_lock = threading.Lock()
+_executor = None
+
+def is_content_addressed(filename: str) -> bool:
+    return bool(CONTENT_ADDRESSED_PATTERN.match(filename))
+
+def fingerprint(path: str, stat_result=None) -> Optional[str]:
+    """Short content hash of a file, re-read only when its mtime or size changes; None if missing"""
+    if stat_result is None:
+        try:
+            stat_result = os.stat(path)
+        except OSError:
+            return None
+    cached = _fingerprints.get(path)
+    if cached and cached[0] == stat_result.st_mtime_ns and cached[1] == stat_result.st_size:
+        return cached[2]
+
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    value = digest.hexdigest()[:12]
+    _fingerprints[path] = (stat_result.st_mtime_ns, stat_result.st_size, value)
+    return value
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fingerprint")
+    return _executor
+
+def _fingerprint_in_background(path: str):
+    try:
+        fingerprint(path)
+    finally:
+        with _hashing_lock:
+            _hashing.discard(path)
+
+def known_fingerprint(path: str, stat_result) -> Optional[str]:
+    """Fingerprint of a file as of `stat_result` if already computed; otherwise None,
+    with the file queued to be hashed off the request path"""
+    cached = _fingerprints.get(path)
+    if cached and cached[0] == stat_result.st_mtime_ns and cached[1] == stat_result.st_size:
+        return cached[2]
+    with _hashing_lock:
+        if path in _hashing:
+            return None
+        _hashing.add(path)
+    _get_executor().submit(_fingerprint_in_background, path)
+    return None
+
+def version_query(path: str, stat_result) -> str:
+    """?v=<fingerprint> pinning a URL to the file's content; empty when the filename is
+    already a content hash or the fingerprint is still being computed"""
+    if is_content_addressed(os.path.basename(path)):
+        return ""
+    version = known_fingerprint(path, stat_result)
+    return f"?v={version}" if version else ""
+
+def cache_control(path: str, query_string: bytes) -> str:
+    """Immutable when the URL pins the exact content, otherwise revalidate every time"""
+    if is_content_addressed(os.path.basename(path)):
+        return IMMUTABLE_CACHE_CONTROL
+    requested = parse_qs(query_string.decode("latin-1")).get("v")
+    if requested and requested[0] == fingerprint(path):
+        return IMMUTABLE_CACHE_CONTROL
+    return REVALIDATE_CACHE_CONTROL
+
+# ==================== PRECOMPRESSION ====================
+
+def precompress(directory: str) -> int:
+    """Write .gz (and .br, if brotli is installed) siblings for text assets; returns files written"""
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            if os.path.getsize(path) < PRECOMPRESS_MIN_BYTES:
+                continue
+            mtime = os.path.getmtime(path)
+            data = None
+            for encoding, suffix in ENCODINGS:
+                if encoding == "br" and brotli is None:
+                    continue
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= mtime:
+                    continue
+                if data is None:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                compressed = brotli.compress(data) if encoding == "br" else gzip.compress(data, 9, mtime=0)
+                with open(target, "wb") as f:
+                    f.write(compressed)
+                written += 1
+    return written
+
+def accepted_encodings(headers: Headers) -> set:
+    """Content codings the client accepts (q=0 entries excluded)"""
+    accepted = set()
+    for part in headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+# ==================== STATIC FILES ====================
+
+class AssetStaticFiles(StaticFiles):
+    """StaticFiles with long-lived caching for fingerprinted URLs and precompressed siblings.
+
+    A request for a text asset is answered from its .br or .gz sibling when
+    the client accepts that coding; such responses always carry
+    Vary: Accept-Encoding so shared caches keep the variants apart.
+    """
+
+    async def get_response(self, path: str, scope):
+        response = None
+        compressible = path.endswith(PRECOMPRESS_EXTENSIONS)
+        if compressible:
+            accepted = accepted_encodings(Headers(scope=scope))
+            for encoding, suffix in ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                try:
+                    response = await super().get_response(path + suffix, scope)
+                except HTTPException:
+                    continue
+                response.headers["Content-Encoding"] = encoding
+                media_type = mimetypes.guess_type(path)[0]
+                if media_type and response.status_code == 200:
+                    response.headers["Content-Type"] = media_type
+                break
+
+        if response is None:
+            response = await super().get_response(path, scope)
+        if compressible:
+            response.headers["Vary"] = "Accept-Encoding"
+
+        response.headers["Cache-Control"] = await run_in_threadpool(
+            self.cache_control, path, scope.get("query_string", b"")
+        )
+        return response
+
+    def cache_control(self, path: str, query_string: bytes) -> str:
+        full_path, _ = self.lookup_path(path)
+        return cache_control(full_path or path, query_string)
@@ -0,0 +1,28 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# main creates its database and static directories at import time, so point
+# both at a scratch directory before it is imported
+TEST_DIR = tempfile.mkdtemp(prefix="hindi-books-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DIR}/test.db"
+os.environ.setdefault("SECRET_KEY", "test-secret-key-" + "x" * 32)
+os.chdir(TEST_DIR)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient
+
+import main
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as test_client:
+        test_client.post("/seed")
+        yield test_client
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    response = client.post("/login", json={"username": "admin", "password": "Admin@123"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,103 @@
+import asyncio
+import os
+
+import pytest
+
+import image_variants
+import main
+from pagination import SORT_COLUMNS
+
+def create_book(client, admin_headers, **overrides) -> dict:
+    book = {
+        "title": "निर्मला",
+        "author": "मुंशी प्रेमचंद",
+        "description": "दहेज प्रथा पर आधारित उपन्यास",
+        "category": "साहित्य",
+        "price": 150.0,
+        "image_url": "nirmala.jpg",
+        "stock_quantity": 10
+    }
+    book.update(overrides)
+    response = client.post("/books", json=book, headers=admin_headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+def test_book_etag_follows_cover_changes(client, admin_headers):
+    """Replacing a cover file in place yields a new ETag (and ?v= URL) for the book"""
+    book = create_book(client, admin_headers, image_url="nirmala-etag.jpg")
+    cover_path = os.path.join(main.image_variants.IMAGES_DIR, "nirmala-etag.jpg")
+    with open(cover_path, "wb") as f:
+        f.write(b"first cover")
+    # Stands in for the background fingerprint finishing
+    main.static_assets.fingerprint(cover_path)
+    main.response_cache.clear()
+
+    first = client.get(f"/books/{book['id']}")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert client.get(f"/books/{book['id']}", headers={"If-None-Match": etag}).status_code == 304
+
+    with open(cover_path, "wb") as f:
+        f.write(b"a different, longer cover")
+    main.static_assets.fingerprint(cover_path)
+    # Stands in for the response cache TTL running out
+    main.response_cache.clear()
+
+    second = client.get(f"/books/{book['id']}", headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["ETag"] != etag
+    assert second.json()["image_url"] != first.json()["image_url"]
+
+def walk_pages(client, params: dict, cursor_key: str, cursor: str = "") -> list:
+    """Follow cursors until they run out; returns the pages' book ids in order"""
+    ids = []
+    for _ in range(100):
+        response = client.get("/books", params={**params, "cursor": cursor})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        ids.append([book["id"] for book in page["books"]])
+        cursor = page[cursor_key]
+        if not cursor:
+            return ids
+    raise AssertionError("cursor paging did not terminate")
+
+@pytest.mark.parametrize("sort_order", ["asc", "desc"])
+@pytest.mark.parametrize("sort_by", [*SORT_COLUMNS, "bogus"])
+def test_cursor_paging_with_fields(client, admin_headers, sort_by, sort_order):
+    """Every book is seen exactly once going forward, and again in reverse going back"""
+    if client.get("/books", params={"per_page": 1}).json()["total"] < 5:
+        for n in range(5):
+            # Repeated prices and authors exercise the id tie-break
+            create_book(client, admin_headers, title=f"कर्मभूमि {n}", author=f"लेखक {n % 2}", price=100.0 + n % 2)
+    expected = {book["id"] for book in client.get("/books", params={"per_page": 50}).json()["books"]}
+    params = {"sort_by": sort_by, "sort_order": sort_order, "fields": "title", "per_page": 2}
+
+    forward = walk_pages(client, params, "next_cursor")
+    seen = [book_id for page in forward for book_id in page]
+    assert len(seen) == len(set(seen)) and set(seen) == expected
+
+    last_page = client.get("/books", params={**params, "cursor": ""}).json()
+    for _ in forward[1:]:
+        last_page = client.get("/books", params={**params, "cursor": last_page["next_cursor"]}).json()
+    backward = walk_pages(client, params, "prev_cursor", last_page["prev_cursor"])
+    assert [book_id for page in reversed(backward) for book_id in page] == seen[:-len(forward[-1])]
+
+@pytest.mark.skipif(not image_variants.enabled(), reason="needs Pillow with WebP or AVIF support")
+@pytest.mark.parametrize("source_width, expected", [(300, [300]), (700, [320, 640, 700]), (1200, [320, 640, 960])])
+def test_srcset_lists_only_real_widths(client, admin_headers, source_width, expected):
+    """Covers are never upscaled, and srcset names only the variants that are rendered"""
+    from PIL import Image
+    filename = f"cover-{source_width}.png"
+    Image.new("RGB", (source_width, source_width * 3 // 2), "white").save(
+        os.path.join(image_variants.IMAGES_DIR, filename)
+    )
+    book = create_book(client, admin_headers, image_url=filename)
+    main.response_cache.clear()
+
+    srcset = client.get(f"/books/{book['id']}").json()["image_srcset"]
+    for fmt, entries in srcset.items():
+        assert [int(entry.rsplit(" ", 1)[1][:-1]) for entry in entries.split(", ")] == expected
+        variant = client.get(entries.split(", ")[-1].split(" ")[0])
+        assert variant.status_code == 200
+    too_wide = image_variants.variant_name(filename, expected[-1] + 1, image_variants.VARIANT_FORMATS[0])
+    assert asyncio.run(image_variants.variant_file(too_wide)) is None
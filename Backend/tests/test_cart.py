@@ -0,0 +1,44 @@
+from query_stats import query_budget
+
+def add_books(client, admin_headers, count: int) -> list:
+    books = [
+        {
+            "title": f"गोदान भाग {n}",
+            "author": "मुंशी प्रेमचंद",
+            "description": "भारतीय किसान जीवन का महान उपन्यास",
+            "category": "साहित्य",
+            "price": 100.0 + n,
+            "image_url": f"godan-{n}.jpg",
+            "stock_quantity": 20
+        }
+        for n in range(count)
+    ]
+    response = client.post("/books/bulk", json={"books": books}, headers=admin_headers)
+    assert response.status_code == 200
+    return response.json()["created_ids"]
+
+def test_cart_read_is_one_query(client, admin_headers):
+    """GET /cart loads items, books and totals in a single statement, however many items"""
+    book_ids = add_books(client, admin_headers, 5)
+    client.delete("/cart", headers=admin_headers)
+    for book_id in book_ids:
+        response = client.post("/cart", json={"book_id": book_id, "quantity": 2}, headers=admin_headers)
+        assert response.status_code == 201
+
+    with query_budget(1):
+        response = client.get("/cart", headers=admin_headers)
+
+    assert response.status_code == 200
+    cart = response.json()
+    assert len(cart["items"]) == 5
+    assert cart["total_items"] == 10
+    assert response.headers["X-DB-Queries"] == "1"
+
+def test_query_budget_catches_extra_queries(client, admin_headers):
+    try:
+        with query_budget(0):
+            client.get("/cart", headers=admin_headers)
+    except AssertionError as e:
+        assert "GET /cart ran 1 queries" in str(e)
+    else:
+        raise AssertionError("query_budget(0) allowed a query")
@@ -4,6 +4,8 @@ Book Upload Script for Hindi Book Website
 This script helps you upload your books to the database
 """
 
+import mimetypes
+import os
 import requests
 from typing import List, Dict
 
@@ -51,12 +53,32 @@ class BookUploader:
 
             book = response.json()
             print(f"✅ Uploaded: {book['title']} by {book['author']}")
-            return True
+            return book['id']
 
         except Exception as e:
             print(f"❌ Failed to upload {book_data.get('title', 'Unknown')}: {e}")
             return False
 
+    def upload_cover(self, book_id: int, path: str):
+        """Upload a local cover image and attach it to a book"""
+        try:
+            with open(path, "rb") as cover:
+                response = self.session.post(
+                    f"{API_BASE_URL}/books/{book_id}/cover",
+                    data=cover,
+                    headers={"Content-Type": mimetypes.guess_type(path)[0] or "application/octet-stream"}
+                )
+            response.raise_for_status()
+
+            result = response.json()
+            note = " (already stored)" if result['deduplicated'] else ""
+            print(f"🖼️  Cover attached to book {book_id}{note}")
+            return True
+
+        except Exception as e:
+            print(f"❌ Failed to upload cover {path}: {e}")
+            return False
+
     def upload_multiple_books(self, books: List[Dict]):
         """Upload multiple books using bulk endpoint"""
         try:
@@ -136,7 +158,8 @@ def main():
             category = input(f"Category (available: {', '.join(categories)}): ").strip()
             price = float(input("Price: ") or "0")
             stock = int(input("Stock quantity: ") or "0")
-            image = input("Image filename (optional): ").strip()
+            image = input("Image filename or local cover path (optional): ").strip()
+            cover_path = image if os.path.isfile(image) else None
 
             book = {
                 "title": title,
@@ -144,10 +167,17 @@ def main():
                 "description": description,
                 "category": category,
                 "price": price,
-                "image_url": image or "placeholder.jpg",
+                "image_url": "placeholder.jpg" if cover_path or not image else image,
                 "stock_quantity": stock
             }
 
+            if cover_path:
+                # Needs the new book's id, so it can't go through the bulk endpoint
+                book_id = uploader.upload_single_book(book)
+                if book_id:
+                    uploader.upload_cover(book_id, cover_path)
+                continue
+
             books.append(book)
             print(f"✅ Added: {title}")
 
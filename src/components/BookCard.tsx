@@ -61,21 +61,38 @@ export function BookCard({ book }: BookCardProps) {
   const getImageUrl = (imageUrl: string) => {
     if (!imageUrl) return "/placeholder.svg";
     if (imageUrl.startsWith("http")) return imageUrl;
+    // The API returns fingerprinted server-relative URLs (/static/...?v=...)
+    if (imageUrl.startsWith("/")) return `http://localhost:8000${imageUrl}`;
     return `http://localhost:8000/static/images/books/${imageUrl}`;
   };
 
+  // Variant URLs in a srcset are server-relative
+  const getSrcSet = (srcset: string) =>
+    srcset.replace(/(^|, )\//g, "$1http://localhost:8000/");
+
   return (
     <Card className="group overflow-hidden transition-all duration-300 hover:shadow-book bg-gradient-card border-border/50">
       <Link to={`/books/${book.id}`}>
         <div className="overflow-hidden aspect-[3/4] cursor-pointer">
-          <img
-            src={getImageUrl(book.image_url)}
-            alt={book.title}
-            className="w-full h-full object-cover transition-transform duration-300 group-hover:scale-105"
-            onError={(e) => {
-              (e.target as HTMLImageElement).src = "/placeholder.svg";
-            }}
-          />
+          <picture>
+            {Object.entries(book.image_srcset ?? {}).map(([format, srcset]) => (
+              <source
+                key={format}
+                type={`image/${format}`}
+                srcSet={getSrcSet(srcset)}
+                sizes="(min-width: 1024px) 25vw, (min-width: 640px) 50vw, 100vw"
+              />
+            ))}
+            <img
+              src={getImageUrl(book.image_url)}
+              alt={book.title}
+              loading="lazy"
+              className="w-full h-full object-cover transition-transform duration-300 group-hover:scale-105"
+              onError={(e) => {
+                (e.target as HTMLImageElement).src = "/placeholder.svg";
+              }}
+            />
+          </picture>
         </div>
       </Link>
       <CardContent className="p-4">
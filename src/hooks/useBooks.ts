@@ -1,6 +1,6 @@
 // React Query hooks for book data fetching
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
-import { api, Book, PaginatedBooks, Category } from '@/lib/api';
+import { api, Book, PaginatedBooks, Category, CARD_FIELDS } from '@/lib/api';
 
 // Types
 interface BookQueryParams {
@@ -38,7 +38,7 @@ export function useBooks(params?: {
 }) {
   return useQuery({
     queryKey: bookKeys.list(params),
-    queryFn: () => api.getBooks(params),
+    queryFn: () => api.getBooks({ ...params, fields: CARD_FIELDS }),
     staleTime: 5 * 60 * 1000, // 5 minutes
   });
 }
@@ -75,7 +75,7 @@ export function useSearchBooks(query: string, limit: number = 10) {
 export function useFeaturedBooks() {
   return useQuery({
     queryKey: bookKeys.list({ page: 1, per_page: 8 }),
-    queryFn: () => api.getBooks({ page: 1, per_page: 8 }),
+    queryFn: () => api.getBooks({ page: 1, per_page: 8, fields: CARD_FIELDS }),
     staleTime: 10 * 60 * 1000, // 10 minutes
   });
 }
@@ -84,7 +84,7 @@ export function useFeaturedBooks() {
 export function useBooksByCategory(category: string, page: number = 1, perPage: number = 12) {
   return useQuery({
     queryKey: bookKeys.list({ category, page, per_page: perPage }),
-    queryFn: () => api.getBooks({ category, page, per_page: perPage }),
+    queryFn: () => api.getBooks({ category, page, per_page: perPage, fields: CARD_FIELDS }),
     enabled: !!category,
     staleTime: 5 * 60 * 1000, // 5 minutes
   });
@@ -12,9 +12,13 @@ export interface Book {
   title: string;
   author: string;
   description: string;
+  // Truncated description for cards; only sent when requested via `fields`
+  summary?: string | null;
   category: string;
   price: number;
   image_url: string;
+  // Resized cover variants keyed by format (avif, webp), as srcset strings
+  image_srcset?: Record<string, string> | null;
   stock_quantity: number;
   is_available: boolean;
   created_at: string;
@@ -46,10 +50,12 @@ export interface LoginResponse {
 
 export interface PaginatedBooks {
   books: Book[];
-  total: number;
+  total: number | null;
   page: number;
   per_page: number;
-  pages: number;
+  pages: number | null;
+  next_cursor?: string | null;
+  prev_cursor?: string | null;
 }
 
 export interface Category {
@@ -79,8 +85,14 @@ export interface BookQueryParams {
   max_price?: number;
   sort_by?: string;
   sort_order?: string;
+  cursor?: string;
+  count?: 'exact' | 'estimate' | 'none';
+  fields?: string;
 }
 
+// What a book card renders; grids request only these to skip the full description
+export const CARD_FIELDS = 'id,title,author,category,price,image_url,image_srcset,stock_quantity';
+
 // API Client with error handling
 class ApiClient {
   private baseURL: string;
@@ -140,16 +152,7 @@ class ApiClient {
   }
 
   // Book endpoints
-  async getBooks(params?: {
-    page?: number;
-    per_page?: number;
-    category?: string;
-    search?: string;
-    min_price?: number;
-    max_price?: number;
-    sort_by?: string;
-    sort_order?: string;
-  }): Promise<PaginatedBooks> {
+  async getBooks(params?: BookQueryParams): Promise<PaginatedBooks> {
     const searchParams = new URLSearchParams();
     if (params) {
       Object.entries(params).forEach(([key, value]) => {
@@ -21,6 +21,8 @@ export default function BookDetailPage() {
   const getImageUrl = (imageUrl: string) => {
     if (!imageUrl) return "/placeholder.svg";
     if (imageUrl.startsWith("http")) return imageUrl;
+    // The API returns fingerprinted server-relative URLs (/static/...?v=...)
+    if (imageUrl.startsWith("/")) return `http://localhost:8000${imageUrl}`;
     return `http://localhost:8000/static/images/books/${imageUrl}`;
   };
 